@@ -0,0 +1,75 @@
+"""Benchmark event delivery on a deep event hierarchy.
+
+Run with ``python benchmarks/event_hierarchy.py``, with generic installed.
+Compares:
+
+- handlers subscribed to every type in the hierarchy, with and without
+  ``Manager(deduplicate=True)``;
+- (re)subscribing a handler to the root of the hierarchy while handling
+  events of all types, with regular and with ``exact`` subscriptions. A
+  regular subscription invalidates the cached handlers of all subtypes, which
+  are then looked up in the registry again. An exact subscription only
+  affects the event type itself.
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from generic.event import Manager
+
+DEPTH = 20
+NUMBER = 20000
+
+
+def make_hierarchy(depth):
+    types = [type("Event0", (), {})]
+    for i in range(1, depth):
+        types.append(type(f"Event{i}", (types[-1],), {}))
+    return types
+
+
+def handler(event):
+    pass
+
+
+def other_handler(event):
+    pass
+
+
+def bench_deduplicate(types, deduplicate):
+    events = Manager(deduplicate=deduplicate)
+    for event_type in types:
+        events.subscribe(handler, event_type)
+    event = types[-1]()
+    return timeit.timeit(lambda: events.handle(event), number=NUMBER)
+
+
+def bench_resubscribe(types, exact):
+    events = Manager()
+    root = types[0]
+    for event_type in types:
+        events.subscribe(handler, event_type, exact=exact)
+    all_events = [event_type() for event_type in types]
+
+    def resubscribe_and_handle():
+        events.subscribe(other_handler, root, exact=exact)
+        for event in all_events:
+            events.handle(event)
+
+    return timeit.timeit(resubscribe_and_handle, number=NUMBER // DEPTH)
+
+
+def main():
+    types = make_hierarchy(DEPTH)
+    print(f"Event hierarchy of depth {DEPTH}, {NUMBER} events")
+    for deduplicate in (False, True):
+        seconds = bench_deduplicate(types, deduplicate)
+        print(f"  handler on every level, deduplicate={deduplicate}: {seconds:.3f}s")
+    for exact in (False, True):
+        seconds = bench_resubscribe(types, exact)
+        print(f"  subscribe and handle all types, exact={exact}: {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
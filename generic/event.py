@@ -3,72 +3,621 @@
 This module provides API for event management.
 """
 
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import itertools
+import json
+import logging
+import struct
+import threading
+import weakref
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import Executor, Future, as_completed
+from queue import Full
 from sys import version_info
-from typing import Callable, Set, Type
+from time import monotonic, perf_counter, time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    IO,
+    Iterable,
+    Iterator,
+    KeysView,
+    List,
+    Literal,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 if version_info < (3, 11):
     from exceptiongroup import ExceptionGroup
 
-from generic.registry import Registry, TypeAxis
+from generic.registry import (
+    Axis,
+    Registry,
+    SimpleAxis,
+    TypeAxis,
+    _Deferred,
+    _IndexedAxis,
+    _import_all,
+    _imported,
+    _MultiTarget,
+    _name_of,
+    _names_of,
+)
 
-__all__ = "Manager"
+__all__ = (
+    "Manager",
+    "AsyncManager",
+    "SubscriptionScope",
+    "HandlerMonitor",
+    "HandlerStats",
+    "EventTrace",
+    "TraceEntry",
+)
 
 Event = object
-Handler = Callable[[object], None]
-HandlerSet = Set[Handler]
+# An event type, or its name as "module:qualname"
+EventType = Union[Type[Event], str]
+Handler = Callable[[object], Union[None, Awaitable[None]]]
 
 
-class Manager:
-    """Event manager.
+class _Subscription(NamedTuple):
+    handler: Handler
+    parallel: bool = False
+    priority: int = 0
+    # The actual handler of a batch subscription, ``handler`` wraps it
+    batch: Handler | None = None
+    # The subscribed handler, or a weak reference for weak subscriptions
+    key: object = None
+    # Whether the subscribed handler is a coroutine function
+    coroutine: bool = False
 
-    Provides API for subscribing for and firing events.
-    """
 
-    registry: Registry[HandlerSet]
+class _Coalesce(NamedTuple):
+    event_type: Type[Event]
+    key: Callable[[Event], Hashable] | None
+    delay: float | None
+
+
+# Subscriptions for an event type and source, in order of subscription
+HandlerSet = Tuple[_Subscription, ...]
+# Subscriptions in execution order, grouped by priority and handler set
+HandlerGroups = Tuple[Tuple[_Subscription, ...], ...]
+Overflow = Literal["block", "drop_oldest", "raise"]
+ErrorPolicy = Union[
+    Literal["group", "collect", "fail_fast"],
+    Callable[[Handler, Event, BaseException], None],
+]
+
+logger = logging.getLogger(__name__)
 
-    def __init__(self) -> None:
-        axes = (("event_type", TypeAxis()),)
+# Set while a coroutine handler holds a share of the concurrency limit
+_holding_limit: ContextVar[bool] = ContextVar("generic_event_limit", default=False)
+
+
+class _BaseManager:
+    """Subscriptions of handlers to event types, and the resolution of the
+    handlers for an event, shared by :class:`Manager` and
+    :class:`AsyncManager`."""
+
+    registry: Registry[_Subscription]
+    monitor: HandlerMonitor | None = None
+    trace: EventTrace | None = None
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        source_attribute: str = "source",
+        errors: ErrorPolicy = "group",
+        deduplicate: bool = False,
+        source_axis: Axis | None = None,
+    ) -> None:
+        if not (callable(errors) or errors in ("group", "collect", "fail_fast")):
+            raise ValueError(f"Unknown error policy: {errors}")
+        self.errors = errors
+        self.deduplicate = deduplicate
+        if source_axis is None:
+            source_axis = SimpleAxis()
+        axes = (("event_type", TypeAxis()), ("source", source_axis))
         self.registry = Registry(*axes)
+        self.source_attribute = source_attribute
+        # With a source axis other than SimpleAxis an event source can match
+        # sources it is not equal to.
+        self._equal_sources = type(source_axis) is SimpleAxis
+        self._source_axis = source_axis
+        self._sources: Dict[object, int] = {}
+        # Index of the subscribed sources, for indexed source axes
+        self._source_index: Any = None
+        self._exact: Dict[object, _MultiTarget] = {}
+        # Subscriptions by handler set key, exact flag and handler, or weak
+        # reference to the handler for weak subscriptions
+        self._subscribed: Dict[Tuple[object, bool, object], _Subscription] = {}
+        self._weak_subscriptions = 0
+        self._handler_cache: Dict[object, HandlerGroups] = {}
+        # Incremented when cached handlers are dropped
+        self._cache_generation = 0
+        self._event_types_seen: Dict[Type[Event], None] = {}
+        self._deferred: _Deferred[Tuple[Any, ...]] = _Deferred()
+        self.executor = executor
+
+    def subscribe(
+        self,
+        handler: Handler,
+        event_type: EventType,
+        parallel: bool = False,
+        weak: bool = False,
+        source: object | None = None,
+        priority: int = 0,
+        batch: bool = False,
+        exact: bool = False,
+    ) -> None:
+        """Subscribe ``handler`` to specified ``event_type``
+
+        Handlers with a higher ``priority`` are executed first.
+
+        If ``batch`` is set, ``handler`` is called with a list of events.
+        :meth:`handle_many` calls it once, with all events it's subscribed
+        to, :meth:`handle` with just the one event.
 
-    def subscribe(self, handler: Handler, event_type: Type[Event]) -> None:
-        """Subscribe ``handler`` to specified ``event_type``"""
-        handler_set = self.registry.get_registration(event_type)
-        if handler_set is None:
-            handler_set = self._register_handler_set(event_type)
-        handler_set.add(handler)
+        If a ``source`` is provided, ``handler`` is only executed for
+        events from that source. The source should be hashable, and is
+        referenced by the manager until all its handlers are unsubscribed.
 
-    def unsubscribe(self, handler: Handler, event_type: Type[Event]) -> None:
+        If ``parallel`` is set, ``handler`` runs in the executor of the
+        manager, concurrently with the other handlers for the event.
+
+        If ``weak`` is set, the manager only keeps a weak reference to
+        ``handler``, or to the object a bound method is bound to. The
+        subscription is removed once the handler is garbage collected.
+
+        If ``exact`` is set, ``handler`` is only executed for events of
+        exactly ``event_type``, not for events of its subtypes, and from a
+        ``source`` equal to the one provided. Unsubscribe it with ``exact``
+        set too.
+        """
+        self._add(handler, event_type, parallel, weak, source, priority, batch, exact)
+        self._invalidate(event_type, source, exact)
+
+    def subscribe_many(
+        self,
+        subscriptions: Iterable[Tuple[Handler, EventType]],
+        parallel: bool = False,
+        weak: bool = False,
+        source: object | None = None,
+        priority: int = 0,
+        batch: bool = False,
+        exact: bool = False,
+    ) -> None:
+        """Subscribe handlers to event types, from ``(handler, event_type)``
+        pairs.
+
+        This is faster than calling :meth:`subscribe` for every handler.
+        The other arguments apply to all handlers, see :meth:`subscribe`.
+        """
+        batched: Dict[Type[Event], List[_Subscription]] = {}
+        try:
+            for handler, event_type in subscriptions:
+                self._add(
+                    handler,
+                    event_type,
+                    parallel,
+                    weak,
+                    source,
+                    priority,
+                    batch,
+                    exact,
+                    batched,
+                )
+        finally:
+            subscribed = self._subscribed
+            for event_type, handler_set in batched.items():
+                key = _key(event_type, source)
+                # Leave out subscriptions replaced later in the batch
+                self.registry._register_multi(
+                    (
+                        s
+                        for s in handler_set
+                        if subscribed.get((key, False, s.key)) is s
+                    ),
+                    event_type,
+                    source,
+                )
+            self._clear_cache()
+
+    def subscription_scope(self) -> SubscriptionScope:
+        """Create a scope for subscriptions that can be unsubscribed all at
+        once.
+
+        The scope is a context manager, leaving the ``with`` block
+        unsubscribes all handlers subscribed through the scope.
+        """
+        return SubscriptionScope(self)
+
+    def _add(
+        self,
+        handler: Handler,
+        event_type: EventType,
+        parallel: bool,
+        weak: bool,
+        source: object | None,
+        priority: int,
+        batch: bool,
+        exact: bool,
+        batched: Dict[Type[Event], List[_Subscription]] | None = None,
+    ) -> None:
+        """Add a subscription, without updating the handler cache. If
+        ``batched`` is provided, subscriptions that are not exact are added
+        to it by event type, to be registered at once."""
+        if self._deferred:
+            self._subscribe_deferred()
+        if isinstance(event_type, str):
+            cls: Type[Event] | None = _imported(event_type)
+            if cls is None:
+                self._deferred.add(
+                    [event_type],
+                    (
+                        handler,
+                        event_type,
+                        parallel,
+                        weak,
+                        source,
+                        priority,
+                        batch,
+                        exact,
+                    ),
+                )
+                return
+            event_type = cls
+        self._discard(event_type, source, exact, handler)
+
+        key: object = handler
+        coroutine = inspect.iscoroutinefunction(handler)
+        if weak:
+            key = _weak_ref(
+                handler,
+                functools.partial(self._discard, event_type, source, exact),
+            )
+            handler = functools.partial(_call_weak, key)
+        if batch:
+            subscription = _Subscription(
+                functools.partial(_call_batch, handler),
+                parallel,
+                priority,
+                handler,
+                key,
+                coroutine,
+            )
+        else:
+            subscription = _Subscription(
+                handler, parallel, priority, key=key, coroutine=coroutine
+            )
+        handler_set_key = _key(event_type, source)
+        if exact:
+            handler_set = self._exact.get(handler_set_key)
+            if handler_set is None:
+                handler_set = self._exact[handler_set_key] = _MultiTarget()
+            handler_set.add(subscription)
+        elif batched is not None:
+            batched.setdefault(event_type, []).append(subscription)
+        else:
+            self.registry.register(subscription, event_type, source, multi=True)
+        self._subscribed[handler_set_key, exact, key] = subscription
+        if weak:
+            self._weak_subscriptions += 1
+        if source is not None:
+            if source not in self._sources:
+                self._source_index = None
+            self._sources[source] = self._sources.get(source, 0) + 1
+
+    def unsubscribe(
+        self,
+        handler: Handler,
+        event_type: EventType,
+        source: object | None = None,
+        exact: bool = False,
+    ) -> None:
         """Unsubscribe ``handler`` from ``event_type``"""
-        handler_set = self.registry.get_registration(event_type)
-        if handler_set and handler in handler_set:
-            handler_set.remove(handler)
+        self._remove(handler, event_type, source, exact)
+        self._invalidate(event_type, source, exact)
 
-    def handle(self, event: Event) -> None:
-        """Fire ``event``
+    def unsubscribe_many(
+        self,
+        subscriptions: Iterable[Tuple[Handler, EventType]],
+        source: object | None = None,
+        exact: bool = False,
+    ) -> None:
+        """Unsubscribe handlers from event types, from ``(handler,
+        event_type)`` pairs.
 
-        All subscribers will be executed with no determined order. If a
-        handler raises an exceptions, an `ExceptionGroup` will be raised
-        containing all raised exceptions.
+        This is faster than calling :meth:`unsubscribe` for every handler.
         """
-        handler_sets = self.registry.query(event)
-        for handler_set in handler_sets:
-            if handler_set:
-                exceptions = []
-                for handler in set(handler_set):
-                    try:
-                        handler(event)
-                    except BaseException as e:
-                        exceptions.append(e)
-                if exceptions:
-                    raise ExceptionGroup("Error while handling events", exceptions)
-
-    def _register_handler_set(self, event_type: Type[Event]) -> HandlerSet:
-        """Register new handler set for ``event_type``."""
-        handler_set: HandlerSet = set()
-        self.registry.register(handler_set, event_type)
-        return handler_set
-
-    def subscriber(self, event_type: Type[Event]) -> Callable[[Handler], Handler]:
+        for handler, event_type in subscriptions:
+            self._remove(handler, event_type, source, exact)
+        self._clear_cache()
+
+    def _remove(
+        self,
+        handler: Handler,
+        event_type: EventType,
+        source: object | None,
+        exact: bool,
+    ) -> None:
+        """Remove a subscription, without updating the handler cache."""
+        if self._deferred:
+            self._subscribe_deferred()
+        if isinstance(event_type, str):
+            cls: Type[Event] | None = _imported(event_type)
+            if cls is None:
+                self._deferred.remove(
+                    lambda item: (
+                        item[:2] == (handler, event_type)
+                        and item[4] == source
+                        and item[7] == exact
+                    )
+                )
+                return
+            event_type = cls
+        self._discard(event_type, source, exact, handler)
+
+    def _subscribe_deferred(self) -> None:
+        """Add the deferred subscriptions of which the event type has been
+        imported."""
+        ready = self._deferred.ready()
+        for handler, name, *options in ready:
+            self._add(handler, _imported(name), *options)
+        if ready:
+            self._clear_cache()
+
+    def _discard(
+        self,
+        event_type: Type[Event],
+        source: object | None,
+        exact: bool,
+        handler: object,
+    ) -> None:
+        """Remove the subscription of ``handler``, whether strongly or weakly
+        subscribed. Called with the weak reference when a weakly subscribed
+        handler is garbage collected."""
+        handler_set_key = _key(event_type, source)
+        subscription = self._subscribed.pop((handler_set_key, exact, handler), None)
+        if (
+            subscription is None
+            and self._weak_subscriptions
+            and not isinstance(handler, weakref.ref)
+        ):
+            try:
+                ref = _weak_ref(handler)  # type: ignore[arg-type]
+            except TypeError:
+                return
+            subscription = self._subscribed.pop((handler_set_key, exact, ref), None)
+        if subscription is None:
+            return
+        if isinstance(subscription.key, weakref.ref):
+            self._weak_subscriptions -= 1
+        if exact:
+            handler_set = self._exact[handler_set_key]
+            if len(handler_set) > 1:
+                handler_set.remove(subscription)
+            else:
+                del self._exact[handler_set_key]
+        else:
+            self.registry.discard(subscription, event_type, source)
+        if source is not None:
+            self._sources[source] -= 1
+            if not self._sources[source]:
+                del self._sources[source]
+                self._source_index = None
+        if isinstance(handler, weakref.ref):
+            self._invalidate(event_type, source, exact)
+
+    def _invalidate(
+        self, event_type: EventType, source: object | None, exact: bool = False
+    ) -> None:
+        """Drop cached handlers for event types affected by a change of the
+        handler set for ``event_type`` and ``source``."""
+        self._cache_generation += 1
+        if isinstance(event_type, str):
+            cls: Type[Event] | None = _imported(event_type)
+            if cls is None:
+                # Nothing is cached for event types that are not imported
+                return
+            event_type = cls
+        if not self._equal_sources:
+            source = None
+        for key in list(self._handler_cache):
+            key_type, key_source = key[:2] if isinstance(key, tuple) else (key, None)
+            if (
+                key_type is event_type if exact else issubclass(key_type, event_type)
+            ) and (source is None or key_source == source):
+                del self._handler_cache[key]
+
+    def _clear_cache(self) -> None:
+        """Drop all cached handlers."""
+        self._cache_generation += 1
+        self._handler_cache.clear()
+
+    def _handlers(self, event: Event) -> HandlerGroups:
+        """Subscriptions for ``event``, in execution order.
+
+        Subscriptions are resolved once per event type, and event source
+        if subscribed to.
+        """
+        key = self._cache_key(event)
+        handlers = self._handler_cache.get(key)
+        if handlers is None:
+            if self._deferred:
+                self._subscribe_deferred()
+            handlers = self._handler_cache[key] = self._resolve(event)
+            self._event_types_seen[type(event)] = None
+        return handlers
+
+    def _source(self, event: Event) -> Hashable | None:
+        """The source of ``event``, or ``None`` if it has none, or one that
+        can't be subscribed to as it's unhashable."""
+        source = getattr(event, self.source_attribute, None)
+        try:
+            hash(source)
+        except TypeError:
+            return None
+        return source
+
+    def _cache_key(self, event: Event) -> object:
+        """The event type, or event type and source if the source may have
+        subscriptions.
+
+        With a source axis other than :class:`SimpleAxis`, the subscribed
+        sources the source matches take the place of the source, so the
+        number of cached handler sets is bounded by the subscriptions rather
+        than by the sources of the events handled.
+        """
+        event_type = type(event)
+        if self._sources:
+            source = self._source(event)
+            if source is None:
+                return event_type
+            subscribed = source in self._sources
+            if self._equal_sources:
+                return (event_type, source) if subscribed else event_type
+            matches = self._source_matches(source)
+            if matches or subscribed:
+                # The source itself is kept for exact subscriptions to it
+                return (event_type, matches, source if subscribed else None)
+        return event_type
+
+    def _source_matches(self, source: object) -> Tuple[object, ...]:
+        """The subscribed sources matching ``source``, in order."""
+        axis = self._source_axis
+        if isinstance(axis, _IndexedAxis):
+            index = self._source_index
+            if index is None:
+                index = self._source_index = axis.index(self._sources.keys())
+            return tuple(index.matches(source))
+        keys: KeysView[Any] = self._sources.keys()
+        return tuple(axis.matches(source, keys))
+
+    def _resolve(self, event: Event) -> HandlerGroups:
+        """Merge all handler sets for ``event`` in execution order."""
+        return self._merge(self._handler_sets(event))
+
+    def _resolve_type(self, event_type: Type[Event]) -> HandlerGroups:
+        """Merge all handler sets for events of ``event_type`` without a
+        source subscribed to, in execution order."""
+        handler_sets = self.registry._query_types(event_type, grouped=True)
+        if self._exact:
+            handler_sets = itertools.chain(
+                (_exact_set(self._exact, event_type),), handler_sets
+            )
+        return self._merge(handler_sets)
+
+    def _merge(self, handler_sets: Iterable[HandlerSet]) -> HandlerGroups:
+        """Merge handler sets, from most to least specific, in execution
+        order."""
+        entries = sorted(
+            (
+                (-subscription.priority, level, seq, subscription.key, subscription)
+                for level, handler_set in enumerate(handler_sets)
+                if handler_set
+                for seq, subscription in enumerate(handler_set)
+            ),
+            key=lambda entry: entry[:3],
+        )
+        if self.deduplicate:
+            entries = _unique(entries)
+        return tuple(
+            tuple(entry[4] for entry in group)
+            for _level, group in itertools.groupby(entries, lambda entry: entry[:2])
+        )
+
+    def _handler_sets(self, event: Event) -> Iterator[HandlerSet]:
+        """Handler sets for ``event``, from most to least specific.
+
+        Handlers for the source of the event precede the handlers for
+        any source, and exact subscriptions precede the others.
+        """
+        handler_sets = self.registry._query_grouped(event)
+        exact = self._exact
+        if exact:
+            handler_sets = itertools.chain(
+                (_exact_set(exact, type(event)),), handler_sets
+            )
+        if self._sources:
+            source = self._source(event)
+            if source is not None:
+                source_sets = self.registry._query_grouped(event, source)
+                if exact:
+                    source_sets = itertools.chain(
+                        (_exact_set(exact, (type(event), source)),), source_sets
+                    )
+                return itertools.chain(source_sets, handler_sets)
+        return handler_sets
+
+    def dump_event_types(self, file: IO[str]) -> None:
+        """Write the types of the events handled to ``file``, to
+        :meth:`warm_up` a manager with.
+
+        Event types are written by qualified name. Event types that can
+        not be imported by name are left out.
+        """
+        names = [_names_of([t]) for t in list(self._event_types_seen)]
+        json.dump({"event_types": [n[0] for n in names if n]}, file)
+
+    def warm_up(self, file: IO[str], background: bool = False) -> int:
+        """Resolve the handlers for the event types written to ``file`` by
+        :meth:`dump_event_types`, so the first events of those types do not
+        have to look them up.
+
+        The modules defining the event types are imported, event types that
+        can not be imported are skipped. If ``background`` is set, handlers
+        are resolved in a separate thread. Returns the number of event types
+        to warm up.
+        """
+        event_types = [
+            types[0]
+            for types in (_import_all([n]) for n in json.load(file)["event_types"])
+            if types is not None
+        ]
+        if background:
+            threading.Thread(
+                target=self._warm_up,
+                args=(event_types,),
+                name="generic-event-warm-up",
+                daemon=True,
+            ).start()
+        else:
+            self._warm_up(event_types)
+        return len(event_types)
+
+    def _warm_up(self, event_types: Iterable[Type[Event]]) -> None:
+        cache = self._handler_cache
+        for event_type in event_types:
+            self._event_types_seen[event_type] = None
+            if event_type in cache:
+                continue
+            generation = self._cache_generation
+            cache.setdefault(event_type, self._resolve_type(event_type))
+            if generation != self._cache_generation:
+                # Subscriptions changed meanwhile, the handlers may be stale
+                cache.pop(event_type, None)
+
+    def subscriber(
+        self, event_type: Type[Event], priority: int = 0
+    ) -> Callable[[Handler], Handler]:
         """Decorator for subscribing handlers.
 
         Works like this:
@@ -85,7 +634,1094 @@ class Manager:
         """
 
         def registrator(func: Handler) -> Handler:
-            self.subscribe(func, event_type)
+            self.subscribe(func, event_type, priority=priority)
             return func
 
         return registrator
+
+
+class Manager(_BaseManager):
+    """Event manager.
+
+    Provides API for subscribing for and firing events.
+
+    Events can also be queued with :meth:`post`. The queue holds at most
+    ``max_queue_size`` events (unbounded if ``0``). When it's full,
+    ``overflow`` determines what happens: ``"block"`` until there's room,
+    ``"drop_oldest"`` queued event, or ``"raise"`` :class:`queue.Full`.
+
+    How exceptions raised by handlers are dealt with is determined by
+    ``errors``:
+
+    ``"group"``
+        Raise an `ExceptionGroup` once the handlers of equal priority and
+        event type have been executed.
+    ``"collect"``
+        Execute all handlers, then raise an `ExceptionGroup`.
+    ``"fail_fast"``
+        Raise the first exception right away, and skip the other handlers.
+    callable
+        Execute all handlers, and call ``errors(handler, event, exception)``
+        for every exception. Nothing is raised.
+
+    Handlers can be subscribed for events from a specific source. The
+    source of an event is its ``source_attribute`` attribute. Sources are
+    matched by ``source_axis``, by default on equality. With a
+    :class:`~generic.registry.TopicAxis` handlers can be subscribed to
+    topics, or topic wildcards such as ``"model.*"``.
+
+    A handler subscribed to several event types in the hierarchy of an
+    event is executed for each of them, unless ``deduplicate`` is set. In
+    that case it's executed once, with the highest priority.
+
+    Event types can be given by name, as ``"module:qualname"``, so handlers
+    can be subscribed without importing the module defining the event
+    type. The subscription takes effect once the module is imported.
+
+    Handlers are resolved once per event type. Write the event types
+    handled to a file with :meth:`dump_event_types`, and resolve their
+    handlers up front with :meth:`warm_up` next time.
+
+    Assign a :class:`HandlerMonitor` to ``monitor`` to collect statistics
+    on handler execution, and an :class:`EventTrace` to ``trace`` to keep
+    track of the most recently handled events.
+
+    Handlers subscribed as ``parallel`` are submitted to ``executor``, a
+    :class:`concurrent.futures.Executor`. For a process pool, both handler
+    and event should be picklable. Without executor, parallel handlers
+    run on the calling thread.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 0,
+        overflow: Overflow = "block",
+        executor: Executor | None = None,
+        source_attribute: str = "source",
+        errors: ErrorPolicy = "group",
+        deduplicate: bool = False,
+        source_axis: Axis | None = None,
+    ) -> None:
+        if overflow not in ("block", "drop_oldest", "raise"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        super().__init__(executor, source_attribute, errors, deduplicate, source_axis)
+        self._run: Callable[[Event, HandlerGroups], None]
+        if callable(errors):
+            self._run = functools.partial(self._run_to_callback, errors)
+        elif errors == "group":
+            self._run = self._run_grouped
+        elif errors == "collect":
+            self._run = self._run_all
+        else:
+            self._run = self._run_fail_fast
+        self._coalescing: Registry[_Coalesce] = Registry(("event_type", TypeAxis()))
+        self._has_coalescing = False
+        # Batches are per thread, holding ``depth`` and ``pending`` events
+        self._batching = threading.local()
+        # Deadline and latest event per debounced key, delivered by a
+        # single timer thread while there are any
+        self._debounce_cond = threading.Condition()
+        self._debounced: Dict[Hashable, Tuple[float, Event]] = {}
+        self._debouncer: threading.Thread | None = None
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self._queue: Deque[Event] = deque()
+        self._queue_cond = threading.Condition()
+        self._drain_thread: int | None = None
+        self._worker: threading.Thread | None = None
+        self._stopping = False
+
+    def handle(self, event: Event) -> None:
+        """Fire ``event``
+
+        Handlers are executed in order of priority. Handlers of equal
+        priority are executed from the most to the least specific event
+        type, in order of subscription. Exceptions raised by handlers are
+        dealt with according to the error policy of the manager, by
+        default an `ExceptionGroup` is raised containing all exceptions
+        raised by handlers of the same priority and event type. Parallel
+        handlers are waited for before returning.
+
+        Events of a type that is coalesced (see :meth:`coalesce`) may be
+        delivered later.
+        """
+        if self._has_coalescing and self._defer(event):
+            return
+        self._deliver(event)
+
+    def handle_many(self, events: Iterable[Event]) -> None:
+        """Fire all ``events``, in order.
+
+        Events are taken from ``events`` one at a time, so it can be a
+        generator. Handlers are resolved once per event type. Handlers
+        subscribed with ``batch=True`` are called after all events have
+        been handled, once, with a list of the events they're subscribed
+        to.
+
+        If an exception is raised, the remaining events are not handled.
+        """
+        run = self._run
+        resolved: Dict[object, Tuple[HandlerGroups, Tuple[_Subscription, ...]]] = {}
+        batches: Dict[_Subscription, List[Event]] = {}
+        for event in events:
+            if self._has_coalescing and self._defer(event):
+                continue
+            key = self._cache_key(event)
+            handlers = resolved.get(key)
+            if handlers is None:
+                handlers = resolved[key] = _split_batch(self._handlers(event))
+            groups, batch_subscriptions = handlers
+            for subscription in batch_subscriptions:
+                batches.setdefault(subscription, []).append(event)
+            if self.trace is None:
+                run(event, groups)
+            else:
+                self._run_traced(self.trace, event, groups)
+
+        for subscription, batch in batches.items():
+            run(batch, ((subscription,),))
+
+    def iter_handle(self, event: Event) -> Iterator[Tuple[Handler, Any]]:
+        """Fire ``event``, yielding ``(handler, result)`` as each handler
+        is executed.
+
+        Handlers are executed lazily, in the same order as by
+        :meth:`handle`, so the remaining handlers are skipped if iteration
+        is stopped. Parallel handlers are executed on the calling thread.
+        An exception raised by a handler propagates right away. Events
+        are not coalesced.
+        """
+        monitor = self.monitor
+        for group in self._handlers(event):
+            for subscription in group:
+                handler = subscription.handler
+                if monitor is None:
+                    result = handler(event)
+                else:
+                    result = monitor.call(handler, event)
+                yield _subscribed_handler(subscription), result
+
+    def _deliver(self, event: Event) -> None:
+        """Execute the subscribers for ``event``."""
+        if self.trace is None:
+            self._run(event, self._handlers(event))
+        else:
+            self._run_traced(self.trace, event, self._handlers(event))
+
+    def _run_traced(
+        self, trace: EventTrace, event: Event, groups: HandlerGroups
+    ) -> None:
+        timestamp = time()
+        start = perf_counter()
+        try:
+            self._run(event, groups)
+        finally:
+            trace.record(
+                timestamp, type(event), sum(map(len, groups)), perf_counter() - start
+            )
+
+    def _run_grouped(self, event: Event, groups: HandlerGroups) -> None:
+        """Execute subscribers, raising once a group of handlers failed."""
+        for group in groups:
+            failures = self._run_group(group, event)
+            if failures:
+                raise ExceptionGroup(
+                    "Error while handling events", [e for _h, e in failures]
+                )
+
+    def _run_all(self, event: Event, groups: HandlerGroups) -> None:
+        """Execute all subscribers, then raise if any failed."""
+        failures = []
+        for group in groups:
+            failures.extend(self._run_group(group, event))
+        if failures:
+            raise ExceptionGroup(
+                "Error while handling events", [e for _h, e in failures]
+            )
+
+    def _run_to_callback(
+        self,
+        on_error: Callable[[Handler, Event, BaseException], None],
+        event: Event,
+        groups: HandlerGroups,
+    ) -> None:
+        """Execute all subscribers, passing exceptions to ``on_error``."""
+        for group in groups:
+            for handler, exception in self._run_group(group, event):
+                on_error(handler, event, exception)
+
+    def _run_fail_fast(self, event: Event, groups: HandlerGroups) -> None:
+        """Execute subscribers, until one fails."""
+        executor = self.executor
+        monitor = self.monitor
+        for group in groups:
+            futures: Dict[Future[Any], Tuple[Handler, float]] = {}
+            try:
+                for handler, parallel, *_ in group:
+                    if parallel and executor:
+                        future = executor.submit(handler, event)
+                        futures[future] = (handler, perf_counter())
+                    elif monitor is not None:
+                        monitor.call(handler, event)
+                    else:
+                        handler(event)
+                for _handler, future in _completed(futures, event, monitor):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _run_group(
+        self, group: Sequence[_Subscription], event: Event
+    ) -> list[tuple[Handler, BaseException]]:
+        """Execute a group of subscribers, and return the failed handlers
+        with their exception."""
+        executor = self.executor
+        monitor = self.monitor
+        failures = []
+        futures: Dict[Future[Any], Tuple[Handler, float]] = {}
+        for handler, parallel, *_ in group:
+            if parallel and executor:
+                futures[executor.submit(handler, event)] = (handler, perf_counter())
+                continue
+            try:
+                if monitor is not None:
+                    monitor.call(handler, event)
+                else:
+                    handler(event)
+            except BaseException as e:
+                failures.append((handler, e))
+        for handler, future in _completed(futures, event, monitor):
+            exception = future.exception()
+            if exception:
+                failures.append((handler, exception))
+        return failures
+
+    def coalesce(
+        self,
+        event_type: Type[Event],
+        key: Callable[[Event], Hashable] | None = None,
+        delay: float | None = None,
+    ) -> None:
+        """Coalesce events of ``event_type`` (and its subtypes).
+
+        Within a :meth:`batch`, events with an equal ``key(event)`` are
+        delivered once, when the batch ends. Only the latest of those
+        events is delivered. Without ``key``, all events of the type are
+        coalesced.
+
+        If a ``delay`` (in seconds) is provided, events fired outside a
+        batch are debounced: the latest event is delivered, from a timer
+        thread shared by all keys, once no event with an equal key has been fired for
+        ``delay`` seconds. Exceptions raised by handlers are then logged.
+        """
+        self._coalescing.register(_Coalesce(event_type, key, delay), event_type)
+        self._has_coalescing = True
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Hold back coalesced events until the end of the ``with`` block.
+
+        Batches can be nested, pending events are delivered when the
+        outermost batch ends, in the order they were first fired. If
+        handlers raise exceptions, an `ExceptionGroup` is raised after
+        all pending events have been delivered.
+
+        A batch only holds back the events fired by the thread it's
+        started in, other threads deliver theirs as usual.
+        """
+        batching = self._batching
+        if not getattr(batching, "depth", 0):
+            batching.depth = 0
+            batching.pending = {}
+        batching.depth += 1
+        try:
+            yield
+        finally:
+            batching.depth -= 1
+            if not batching.depth:
+                self._flush_batch()
+
+    def _defer(self, event: Event) -> bool:
+        """Hold back ``event`` if it should be coalesced.
+
+        Returns ``True`` if the event is deferred.
+        """
+        policy = self._coalescing.lookup(event)
+        if policy is None:
+            return False
+
+        key = (policy.event_type, policy.key(event) if policy.key else None)
+        batching = self._batching
+        if getattr(batching, "depth", 0):
+            batching.pending[key] = event
+            return True
+
+        if policy.delay is None:
+            return False
+
+        deadline = monotonic() + policy.delay
+        with self._debounce_cond:
+            new = key not in self._debounced
+            self._debounced[key] = (deadline, event)
+            if self._debouncer is None:
+                self._debouncer = threading.Thread(
+                    target=self._debounce, name="generic-event-debounce", daemon=True
+                )
+                self._debouncer.start()
+            elif new:
+                # Deadlines of other keys may be later
+                self._debounce_cond.notify()
+        return True
+
+    def _flush_batch(self) -> None:
+        batching = self._batching
+        pending, batching.pending = batching.pending, {}
+        exceptions = []
+        for event in pending.values():
+            try:
+                self._deliver(event)
+            except BaseException as e:
+                exceptions.append(e)
+        if exceptions:
+            raise ExceptionGroup("Error while handling events", exceptions)
+
+    def _debounce(self) -> None:
+        """Deliver debounced events as their deadlines pass, until there
+        are none left."""
+        cond = self._debounce_cond
+        debounced = self._debounced
+        while True:
+            with cond:
+                while True:
+                    if not debounced:
+                        self._debouncer = None
+                        return
+                    now = monotonic()
+                    deadline = min(d for d, _event in debounced.values())
+                    if deadline <= now:
+                        break
+                    cond.wait(deadline - now)
+                due = [key for key, (d, _event) in debounced.items() if d <= now]
+                events = [debounced.pop(key)[1] for key in due]
+            for event in events:
+                try:
+                    self._deliver(event)
+                except BaseException:
+                    logger.exception("Error while handling event %s", event)
+
+    def post(self, event: Event) -> None:
+        """Queue ``event`` for delivery.
+
+        Queued events are delivered in the order they're posted. An event
+        posted from a handler is delivered after the current event has
+        been handled, instead of recursively. If no worker thread is
+        running, the posting thread drains the queue right away and
+        exceptions raised by handlers propagate from here.
+        """
+        cond = self._queue_cond
+        while True:
+            with cond:
+                idle = self._worker is None and self._drain_thread is None
+                if not (idle and self._full() and self.overflow == "block"):
+                    self._enqueue(event)
+                    if not idle:
+                        return
+                    break
+            # Nobody drains the full queue, make room first
+            self.drain()
+        self.drain()
+
+    def drain(self) -> None:
+        """Deliver queued events until the queue is empty.
+
+        Does nothing if the queue is already being drained, by another
+        thread or further up the stack. If handlers raise exceptions, the
+        remaining events are delivered before the first exception is
+        raised.
+        """
+        cond = self._queue_cond
+        with cond:
+            if self._worker is not None or self._drain_thread is not None:
+                return
+            self._drain_thread = threading.get_ident()
+        error: Exception | None = None
+        try:
+            while True:
+                with cond:
+                    if not self._queue:
+                        break
+                    event = self._queue.popleft()
+                    cond.notify_all()
+                try:
+                    self.handle(event)
+                except Exception as e:
+                    if error is None:
+                        error = e
+        finally:
+            with cond:
+                self._drain_thread = None
+        if error is not None:
+            raise error
+
+    def start_worker(self) -> None:
+        """Deliver posted events from a dedicated worker thread.
+
+        Exceptions raised by handlers are logged.
+        """
+        with self._queue_cond:
+            if self._worker is not None:
+                raise RuntimeError("Worker thread is already running.")
+            self._stopping = False
+            self._worker = threading.Thread(
+                target=self._work, name="generic-event-worker", daemon=True
+            )
+            self._worker.start()
+
+    def stop_worker(self, timeout: float | None = None) -> None:
+        """Stop the worker thread, after it has delivered all queued
+        events."""
+        with self._queue_cond:
+            worker = self._worker
+            if worker is None:
+                return
+            self._stopping = True
+            self._queue_cond.notify_all()
+        worker.join(timeout)
+
+    def _work(self) -> None:
+        cond = self._queue_cond
+        with cond:
+            self._drain_thread = threading.get_ident()
+        while True:
+            with cond:
+                while not self._queue and not self._stopping:
+                    cond.wait()
+                if not self._queue:
+                    self._drain_thread = None
+                    self._worker = None
+                    return
+                event = self._queue.popleft()
+                cond.notify_all()
+            try:
+                self.handle(event)
+            except BaseException:
+                logger.exception("Error while handling event %s", event)
+
+    def _full(self) -> bool:
+        return bool(self.max_queue_size) and len(self._queue) >= self.max_queue_size
+
+    def _enqueue(self, event: Event) -> None:
+        """Append ``event`` to the queue, applying the overflow policy.
+
+        Should be called with the queue condition held.
+        """
+        queue = self._queue
+        max_size = self.max_queue_size
+        if max_size and len(queue) >= max_size:
+            if self.overflow == "drop_oldest":
+                queue.popleft()
+            elif self.overflow == "raise":
+                raise Full("Event queue is full")
+            elif self._drain_thread == threading.get_ident():
+                raise Full("Event queue is full, can not block the draining thread")
+            elif self._worker is None and self._drain_thread is None:
+                raise Full("Event queue is full, and it's not being drained")
+            else:
+                while len(queue) >= max_size:
+                    self._queue_cond.wait()
+        queue.append(event)
+        self._queue_cond.notify_all()
+
+
+class SubscriptionScope:
+    """Keeps track of subscriptions, so they can be unsubscribed at once.
+
+    Created by :meth:`Manager.subscription_scope`.
+    """
+
+    def __init__(self, manager: _BaseManager) -> None:
+        self.manager = manager
+        self._subscriptions: List[Tuple[Handler, EventType, object | None, bool]] = []
+
+    def __enter__(self) -> SubscriptionScope:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def subscribe(
+        self, handler: Handler, event_type: EventType, **options: Any
+    ) -> None:
+        """Subscribe ``handler`` to ``event_type``, see
+        :meth:`Manager.subscribe`."""
+        self.manager.subscribe(handler, event_type, **options)
+        self._subscriptions.append(
+            (handler, event_type, options.get("source"), options.get("exact", False))
+        )
+
+    def subscribe_many(
+        self, subscriptions: Iterable[Tuple[Handler, EventType]], **options: Any
+    ) -> None:
+        """Subscribe handlers to event types, see
+        :meth:`Manager.subscribe_many`."""
+        subscriptions = list(subscriptions)
+        self.manager.subscribe_many(subscriptions, **options)
+        source = options.get("source")
+        exact = options.get("exact", False)
+        self._subscriptions.extend((h, t, source, exact) for h, t in subscriptions)
+
+    def close(self) -> None:
+        """Unsubscribe all handlers subscribed through this scope."""
+        manager = self.manager
+        for handler, event_type, source, exact in self._subscriptions:
+            manager._remove(handler, event_type, source, exact)
+        manager._clear_cache()
+        self._subscriptions.clear()
+
+
+class HandlerStats(NamedTuple):
+    """Execution statistics of an event handler."""
+
+    handler: Handler
+    calls: int
+    total_time: float
+    max_time: float
+    exceptions: int
+
+
+class HandlerMonitor:
+    """Collects execution statistics of event handlers.
+
+    Assign a monitor to :attr:`Manager.monitor` to enable it, and assign
+    ``None`` to disable it again. If ``on_slow`` is provided, it's called
+    with handler, event and execution time (in seconds) for each handler
+    call taking longer than ``slow_threshold`` seconds.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float | None = None,
+        on_slow: Callable[[Handler, Event, float], None] | None = None,
+    ) -> None:
+        self.slow_threshold = slow_threshold
+        self.on_slow = on_slow
+        self._lock = threading.Lock()
+        self._stats: Dict[Handler, List[Any]] = {}
+        self._event_types: Dict[Type[Event], int] = {}
+
+    def call(self, handler: Handler, event: Event) -> Any:
+        """Call ``handler`` and record its statistics."""
+        failed = False
+        start = perf_counter()
+        try:
+            return handler(event)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._finish(handler, event, perf_counter() - start, failed)
+
+    def _finish(
+        self, handler: Handler, event: Event, elapsed: float, failed: bool
+    ) -> None:
+        """Record a finished handler call."""
+        self._record(handler, type(event), elapsed, failed)
+        threshold = self.slow_threshold
+        if self.on_slow and threshold is not None and elapsed > threshold:
+            self.on_slow(handler, event, elapsed)
+
+    def _record(
+        self, handler: Handler, event_type: Type[Event], elapsed: float, failed: bool
+    ) -> None:
+        with self._lock:
+            stats = self._stats.get(handler)
+            if stats is None:
+                self._stats[handler] = [1, elapsed, elapsed, int(failed)]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = max(stats[2], elapsed)
+                stats[3] += failed
+            self._event_types[event_type] = self._event_types.get(event_type, 0) + 1
+
+    def snapshot(self) -> list[HandlerStats]:
+        """Statistics per handler, the most time consuming handler
+        first."""
+        with self._lock:
+            stats = [HandlerStats(h, *s) for h, s in self._stats.items()]
+        return sorted(stats, key=lambda s: s.total_time, reverse=True)
+
+    def handler_calls(self) -> dict[Type[Event], int]:
+        """Number of handler calls per event type."""
+        with self._lock:
+            return dict(self._event_types)
+
+    def reset(self) -> None:
+        """Clear all collected statistics."""
+        with self._lock:
+            self._stats.clear()
+            self._event_types.clear()
+
+
+class TraceEntry(NamedTuple):
+    """A handled event, as recorded by :class:`EventTrace`."""
+
+    timestamp: float
+    event_type: Type[Event] | str
+    handler_count: int
+    duration: float
+
+
+class EventTrace:
+    """Records the most recently handled events.
+
+    Assign a trace to :attr:`Manager.trace` to enable it. For each
+    handled event the time, event type, number of handlers and time it
+    took to execute the handlers is recorded. Storage for ``size``
+    entries is allocated up front. Once it's full, the oldest entries are
+    overwritten.
+    """
+
+    _HEADER = struct.Struct("<4sII")
+    _ENTRY = struct.Struct("<dIId")
+    _MAGIC = b"GETR"
+
+    def __init__(self, size: int = 4096) -> None:
+        if size < 1:
+            raise ValueError("Trace size should be at least 1.")
+        self.size = size
+        self._timestamps = array("d", [0.0]) * size
+        self._durations = array("d", [0.0]) * size
+        self._type_indices = array("I", [0]) * size
+        self._handler_counts = array("I", [0]) * size
+        self._types: List[Type[Event]] = []
+        self._type_index: Dict[Type[Event], int] = {}
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._recorded = 0
+
+    def record(
+        self,
+        timestamp: float,
+        event_type: Type[Event],
+        handler_count: int,
+        duration: float,
+    ) -> None:
+        """Add an entry, overwriting the oldest entry if the trace is
+        full."""
+        type_index = self._type_index.get(event_type)
+        if type_index is None:
+            with self._lock:
+                type_index = self._type_index.setdefault(event_type, len(self._types))
+                if type_index == len(self._types):
+                    self._types.append(event_type)
+        n = next(self._counter)
+        i = n % self.size
+        self._timestamps[i] = timestamp
+        self._type_indices[i] = type_index
+        self._handler_counts[i] = handler_count
+        self._durations[i] = duration
+        self._recorded = max(self._recorded, n + 1)
+
+    def __len__(self) -> int:
+        return min(self._recorded, self.size)
+
+    def entries(self) -> list[TraceEntry]:
+        """The recorded entries, oldest first."""
+        recorded = self._recorded
+        types = self._types
+        entries = []
+        for n in range(max(recorded - self.size, 0), recorded):
+            i = n % self.size
+            entries.append(
+                TraceEntry(
+                    self._timestamps[i],
+                    types[self._type_indices[i]],
+                    self._handler_counts[i],
+                    self._durations[i],
+                )
+            )
+        return entries
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._counter = itertools.count()
+        self._recorded = 0
+
+    def dump(self, file: BinaryIO) -> None:
+        """Write the entries to ``file`` in a compact binary format.
+
+        Use :meth:`load` to read them back.
+        """
+        recorded = self._recorded
+        names = [_name_of(t, strict=False) for t in self._types]
+        indices = range(max(recorded - self.size, 0), recorded)
+        file.write(self._HEADER.pack(self._MAGIC, len(names), len(indices)))
+        for name in names:
+            encoded = name.encode()
+            file.write(struct.pack("<H", len(encoded)))
+            file.write(encoded)
+        for n in indices:
+            i = n % self.size
+            file.write(
+                self._ENTRY.pack(
+                    self._timestamps[i],
+                    self._type_indices[i],
+                    self._handler_counts[i],
+                    self._durations[i],
+                )
+            )
+
+    def dump_json(self, file: IO[str]) -> None:
+        """Write the entries to ``file`` as JSON."""
+        json.dump(
+            [
+                {
+                    "timestamp": timestamp,
+                    "event_type": _name_of(event_type, strict=False),
+                    "handler_count": handler_count,
+                    "duration": duration,
+                }
+                for timestamp, event_type, handler_count, duration in self.entries()
+            ],
+            file,
+        )
+
+    @classmethod
+    def load(cls, file: BinaryIO) -> list[TraceEntry]:
+        """Read entries written by :meth:`dump`.
+
+        Event types are represented by their qualified name, as
+        ``"module:qualname"``.
+        """
+        magic, type_count, entry_count = cls._HEADER.unpack(file.read(cls._HEADER.size))
+        if magic != cls._MAGIC:
+            raise ValueError("Not an event trace file")
+        names = []
+        for _ in range(type_count):
+            (length,) = struct.unpack("<H", file.read(2))
+            names.append(file.read(length).decode())
+        entries = []
+        for _ in range(entry_count):
+            timestamp, type_index, handler_count, duration = cls._ENTRY.unpack(
+                file.read(cls._ENTRY.size)
+            )
+            entries.append(
+                TraceEntry(timestamp, names[type_index], handler_count, duration)
+            )
+        return entries
+
+
+def _weak_ref(
+    handler: Handler, callback: Callable[[weakref.ref[Any]], object] | None = None
+) -> weakref.ref[Any]:
+    if inspect.ismethod(handler):
+        return weakref.WeakMethod(handler, callback)
+    return weakref.ref(handler, callback)
+
+
+def _call_weak(ref: weakref.ref[Any], event: Event) -> Any:
+    """Call the handler referenced by ``ref``, if it's still alive."""
+    handler = ref()
+    return None if handler is None else handler(event)
+
+
+def _call_batch(handler: Handler, event: Event) -> Any:
+    """Call a batch handler for a single event."""
+    return handler([event])
+
+
+def _subscribed_handler(subscription: _Subscription) -> Handler:
+    """The handler as it was subscribed."""
+    handler = subscription.batch or subscription.handler
+    if isinstance(handler, functools.partial) and handler.func is _call_weak:
+        return handler.args[0]()  # type: ignore[no-any-return]
+    return handler
+
+
+def _split_batch(
+    groups: HandlerGroups,
+) -> Tuple[HandlerGroups, Tuple[_Subscription, ...]]:
+    """Separate the batch subscriptions from ``groups``, and make them call
+    the batch handler directly."""
+    batch = tuple(
+        _Subscription(s.batch, s.parallel, s.priority, coroutine=s.coroutine)
+        for group in groups
+        for s in group
+        if s.batch
+    )
+    if not batch:
+        return groups, batch
+    groups = tuple(
+        regular
+        for regular in (tuple(s for s in group if not s.batch) for group in groups)
+        if regular
+    )
+    return groups, batch
+
+
+def _key(event_type: Type[Event], source: object | None) -> object:
+    """Key for exact subscriptions, the same as the handler cache key."""
+    return event_type if source is None else (event_type, source)
+
+
+def _exact_set(exact: Dict[object, _MultiTarget], key: object) -> HandlerSet:
+    """The exact subscriptions for the handler set ``key``."""
+    handler_set = exact.get(key)
+    return () if handler_set is None else handler_set.snapshot()
+
+
+def _unique(entries: list[Tuple[Any, ...]]) -> list[Tuple[Any, ...]]:
+    """Keep the first of the subscription entries with the same key."""
+    seen = set()
+    unique = []
+    for entry in entries:
+        if entry[3] not in seen:
+            seen.add(entry[3])
+            unique.append(entry)
+    return unique
+
+
+class AsyncManager(_BaseManager):
+    """Event manager for :mod:`asyncio` applications.
+
+    Subscribing works the same as for :class:`Manager`, but handlers may
+    also be coroutine functions. At most ``concurrency`` coroutine
+    handlers run at the same time, over all events being handled, or an
+    unlimited number if it's ``None``. Events fired by a coroutine handler
+    are handled within its share of the limit, so they can't deadlock
+    waiting for it. Regular handlers are called inline, or, if they're
+    subscribed as ``parallel`` or ``sync_in_executor`` is set, in
+    ``executor`` (the loop's default executor if ``None``).
+
+    Exceptions are dealt with according to ``errors``, as by
+    :class:`Manager`, where the handlers running concurrently form a
+    group. With ``"fail_fast"``, the first exception is raised once the
+    group has finished. A :attr:`monitor` measures coroutine handlers until
+    they're finished.
+
+    It's not a :class:`Manager`: events can not be queued with
+    :meth:`Manager.post`, use an :class:`asyncio.Queue` instead, and
+    events are not coalesced.
+    """
+
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        executor: Executor | None = None,
+        sync_in_executor: bool = False,
+        source_attribute: str = "source",
+        errors: ErrorPolicy = "group",
+        deduplicate: bool = False,
+        source_axis: Axis | None = None,
+    ) -> None:
+        super().__init__(executor, source_attribute, errors, deduplicate, source_axis)
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("Concurrency limit should be at least 1.")
+        self.concurrency = concurrency
+        self.sync_in_executor = sync_in_executor
+        # Created on first use, as it's bound to the running loop
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+
+    async def handle(self, event: Event) -> None:
+        """Fire ``event``
+
+        Handlers are processed in the same order as by
+        :meth:`Manager.handle`, handlers of equal priority and event type
+        run concurrently. By default, if a handler raises an exception, an
+        `ExceptionGroup` will be raised containing all exceptions raised
+        by the handlers running concurrently.
+        """
+        await self._deliver(event, self._handlers(event))
+
+    async def handle_many(self, events: Iterable[Event]) -> None:
+        """Fire all ``events``, in order, like :meth:`Manager.handle_many`.
+
+        Handlers subscribed with ``batch=True`` are called after all
+        events have been handled, once, with a list of the events they're
+        subscribed to.
+        """
+        resolved: Dict[object, Tuple[HandlerGroups, Tuple[_Subscription, ...]]] = {}
+        batches: Dict[_Subscription, List[Event]] = {}
+        for event in events:
+            key = self._cache_key(event)
+            handlers = resolved.get(key)
+            if handlers is None:
+                handlers = resolved[key] = _split_batch(self._handlers(event))
+            groups, batch_subscriptions = handlers
+            for subscription in batch_subscriptions:
+                batches.setdefault(subscription, []).append(event)
+            await self._deliver(event, groups)
+
+        for subscription, batch in batches.items():
+            await self._run(batch, ((subscription,),))
+
+    async def iter_handle(self, event: Event) -> AsyncIterator[Tuple[Handler, Any]]:
+        """Fire ``event``, yielding ``(handler, result)`` as each handler
+        is executed, like :meth:`Manager.iter_handle`.
+
+        Handlers are executed one at a time, coroutine handlers are
+        awaited before their result is yielded.
+        """
+        monitor = self.monitor
+        for group in self._handlers(event):
+            for subscription in group:
+                handler = subscription.handler
+                start = perf_counter()
+                failed = True
+                try:
+                    result: Any = handler(event)
+                    if inspect.isawaitable(result):
+                        result = await result
+                    failed = False
+                finally:
+                    if monitor is not None:
+                        monitor._finish(handler, event, perf_counter() - start, failed)
+                yield _subscribed_handler(subscription), result
+
+    async def _deliver(self, event: Event, groups: HandlerGroups) -> None:
+        trace = self.trace
+        if trace is None:
+            await self._run(event, groups)
+            return
+        timestamp = time()
+        start = perf_counter()
+        try:
+            await self._run(event, groups)
+        finally:
+            trace.record(
+                timestamp, type(event), sum(map(len, groups)), perf_counter() - start
+            )
+
+    async def _run(self, event: Event, groups: HandlerGroups) -> None:
+        """Execute the groups of subscribers one after the other, dealing
+        with exceptions according to the error policy."""
+        errors = self.errors
+        collected: list[BaseException] = []
+        for group in groups:
+            failures = await self._run_handlers(group, event)
+            if not failures:
+                continue
+            if callable(errors):
+                for handler, exception in failures:
+                    errors(handler, event, exception)
+            elif errors == "collect":
+                collected.extend(e for _h, e in failures)
+            elif errors == "fail_fast":
+                raise failures[0][1]
+            else:
+                raise ExceptionGroup(
+                    "Error while handling events", [e for _h, e in failures]
+                )
+        if collected:
+            raise ExceptionGroup("Error while handling events", collected)
+
+    def _limit(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore | None:
+        """The semaphore limiting coroutine handlers on ``loop``."""
+        if not self.concurrency:
+            return None
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run_handlers(
+        self, subscriptions: Sequence[_Subscription], event: Event
+    ) -> list[tuple[Handler, BaseException]]:
+        """Run ``handlers`` concurrently, returning the failed handlers with
+        their exception."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._limit(loop)
+        monitor = self.monitor
+        failures: list[tuple[Handler, BaseException]] = []
+        pending: list[Awaitable[Any]] = []
+        pending_handlers: list[Handler] = []
+        for subscription in subscriptions:
+            handler = subscription.handler
+            record = None
+            if monitor is not None:
+                record = functools.partial(monitor._finish, handler, event)
+            if (
+                subscription.parallel or self.sync_in_executor
+            ) and not subscription.coroutine:
+                future = loop.run_in_executor(self.executor, handler, event)
+                pending.append(_timed(future, record))
+                pending_handlers.append(handler)
+                continue
+            start = perf_counter()
+            try:
+                result = handler(event)
+            except BaseException as e:
+                failures.append((handler, e))
+                if record is not None:
+                    record(perf_counter() - start, True)
+                continue
+            if inspect.isawaitable(result):
+                pending.append(_limited(semaphore, _timed(result, record)))
+                pending_handlers.append(handler)
+            elif record is not None:
+                record(perf_counter() - start, False)
+
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        failures.extend(
+            (handler, result)
+            for handler, result in zip(pending_handlers, results, strict=True)
+            if isinstance(result, BaseException)
+        )
+        return failures
+
+
+def _completed(
+    futures: Dict[Future[Any], Tuple[Handler, float]],
+    event: Event,
+    monitor: HandlerMonitor | None,
+) -> Iterator[Tuple[Handler, Future[Any]]]:
+    """Yield the handlers of ``futures`` with their future as they finish.
+
+    ``futures`` map to their handler and the time they were submitted at.
+    The time until they finished is recorded with ``monitor``, if
+    provided, here rather than in the executor, which may run them in
+    another process.
+    """
+    for future in as_completed(futures):
+        handler, start = futures[future]
+        if monitor is not None:
+            failed = future.cancelled() or future.exception() is not None
+            monitor._finish(handler, event, perf_counter() - start, failed)
+        yield handler, future
+
+
+async def _limited(
+    semaphore: asyncio.Semaphore | None, awaitable: Awaitable[Any]
+) -> None:
+    """Await ``awaitable``, holding ``semaphore`` if provided, unless it's
+    awaited by a handler that holds it already."""
+    if semaphore is None or _holding_limit.get():
+        await awaitable
+        return
+    async with semaphore:
+        token = _holding_limit.set(True)
+        try:
+            await awaitable
+        finally:
+            _holding_limit.reset(token)
+
+
+async def _timed(
+    awaitable: Awaitable[Any], record: Callable[[float, bool], None] | None
+) -> None:
+    """Await ``awaitable``, and pass the time it took and whether it failed
+    to ``record``, if provided."""
+    if record is None:
+        await awaitable
+        return
+    start = perf_counter()
+    failed = True
+    try:
+        await awaitable
+        failed = False
+    finally:
+        record(perf_counter() - start, failed)
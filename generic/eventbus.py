@@ -0,0 +1,213 @@
+"""Share events between processes.
+
+An :class:`EventBridge` forwards events handled by a local
+:class:`~generic.event.Manager` to a manager in another process, over a
+:mod:`multiprocessing` connection, and delivers the events it receives to the
+local manager.
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+import threading
+from typing import Any, FrozenSet, Iterable, List, Protocol, Type
+
+from generic.event import Event, Manager
+
+__all__ = ("EventBridge",)
+
+logger = logging.getLogger(__name__)
+
+
+class Connection(Protocol):
+    """The part of :class:`multiprocessing.connection.Connection` used by the
+    bridge."""
+
+    def send_bytes(self, buf: bytes) -> None: ...
+
+    def recv_bytes(self) -> bytes: ...
+
+    def poll(self, timeout: float | None = 0.0) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+class Serializer(Protocol):
+    """Turns a list of events into bytes and back, like :mod:`pickle`."""
+
+    def dumps(self, obj: Any) -> bytes: ...
+
+    def loads(self, data: bytes) -> Any: ...
+
+
+class EventBridge:
+    """Forward events between a local manager and a remote process.
+
+    Events of ``event_types`` handled by ``manager`` are sent over
+    ``connection``, which can be one end of a :func:`multiprocessing.Pipe`, or
+    a connection made with :mod:`multiprocessing.connection` (for example over
+    a Unix socket). Events are sent in batches of up to ``batch_size`` events,
+    one message per batch; :meth:`flush` sends a partial batch. When
+    ``flush_interval`` is set, a partial batch is sent by a background thread
+    after at most that many seconds.
+
+    Received events are delivered to ``manager`` with
+    :meth:`~generic.event.Manager.handle_many`, either by calling
+    :meth:`receive`, or from a background thread started with :meth:`start`.
+    Received events are not forwarded back over the connection.
+
+    ``serializer`` converts a batch (a list of events) to bytes and back. It
+    defaults to :mod:`pickle`.
+    """
+
+    def __init__(
+        self,
+        manager: Manager,
+        connection: Connection,
+        event_types: Iterable[Type[Event]] = (),
+        serializer: Serializer = pickle,
+        batch_size: int = 64,
+        flush_interval: float | None = None,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size should be at least 1.")
+        self.manager = manager
+        self.connection = connection
+        self.serializer = serializer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._event_types = list(event_types)
+        self._pending: List[Event] = []
+        self._send_cond = threading.Condition()
+        self._receiving = threading.local()
+        self._receiver: threading.Thread | None = None
+        self._sender: threading.Thread | None = None
+        self._closed = False
+        manager.subscribe_many((self._forward, t) for t in self._event_types)
+        if flush_interval is not None:
+            self._sender = threading.Thread(
+                target=self._send_periodically,
+                name="generic-eventbus-sender",
+                daemon=True,
+            )
+            self._sender.start()
+
+    def _forward(self, event: Event) -> None:
+        if id(event) in getattr(self._receiving, "events", ()):
+            return
+        with self._send_cond:
+            self._pending.append(event)
+            if len(self._pending) >= self.batch_size:
+                self._send_pending()
+            elif len(self._pending) == 1:
+                self._send_cond.notify()
+
+    def flush(self) -> None:
+        """Send all events that are waiting to be batched."""
+        with self._send_cond:
+            self._send_pending()
+
+    def _send_pending(self) -> None:
+        """Send the pending batch.
+
+        Should be called with the send condition held.
+        """
+        if self._pending:
+            data = self.serializer.dumps(self._pending)
+            self._pending = []
+            self.connection.send_bytes(data)
+
+    def _send_periodically(self) -> None:
+        cond = self._send_cond
+        with cond:
+            while not self._closed:
+                if not self._pending:
+                    cond.wait()
+                    continue
+                cond.wait(self.flush_interval)
+                try:
+                    self._send_pending()
+                except (OSError, EOFError):
+                    logger.exception("Could not send events")
+                    return
+
+    def receive(self, timeout: float | None = 0.0) -> int:
+        """Deliver the received events to the local manager.
+
+        Waits at most ``timeout`` seconds for a first batch (``None`` waits
+        forever), then delivers all batches that have arrived, until the other
+        end of the connection is closed. Returns the number of events
+        delivered.
+        """
+        connection = self.connection
+        count = 0
+        while connection.poll(timeout):
+            timeout = 0.0
+            try:
+                data = connection.recv_bytes()
+            except EOFError:
+                break
+            events = self.serializer.loads(data)
+            count += len(events)
+            self._deliver(events)
+        return count
+
+    def _deliver(self, events: List[Event]) -> None:
+        # Only the received events themselves are not forwarded, events
+        # fired by their handlers are
+        receiving = self._receiving
+        outer: FrozenSet[int] = getattr(receiving, "events", frozenset())
+        receiving.events = outer | {id(e) for e in events}
+        try:
+            self.manager.handle_many(events)
+        finally:
+            receiving.events = outer
+
+    def start(self) -> None:
+        """Deliver received events from a dedicated thread.
+
+        Exceptions raised by handlers are logged.
+        """
+        if self._receiver is not None:
+            raise RuntimeError("Receiver thread is already running.")
+        self._receiver = threading.Thread(
+            target=self._receive_forever, name="generic-eventbus-receiver", daemon=True
+        )
+        self._receiver.start()
+
+    def _receive_forever(self) -> None:
+        connection = self.connection
+        while True:
+            try:
+                data = connection.recv_bytes()
+            except (OSError, EOFError):
+                return
+            events = self.serializer.loads(data)
+            try:
+                self._deliver(events)
+            except BaseException:
+                logger.exception("Error while handling events %s", events)
+
+    def close(self) -> None:
+        """Send pending events, stop forwarding and close the connection.
+
+        The receiver thread, if started, stops when the other end of the
+        connection is closed.
+        """
+        self.manager.unsubscribe_many((self._forward, t) for t in self._event_types)
+        with self._send_cond:
+            self._closed = True
+            self._send_cond.notify_all()
+            try:
+                self._send_pending()
+            finally:
+                self.connection.close()
+        if self._sender is not None:
+            self._sender.join()
+
+    def __enter__(self) -> EventBridge:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -8,25 +8,69 @@ from __future__ import annotations
 
 import functools
 import inspect
+import json
 import logging
-from typing import Any, Callable, Generic, TypeVar, Union, cast
-
-from generic.registry import Registry, TypeAxis
-
-__all__ = "multidispatch"
+import threading
+from time import perf_counter
+from types import GenericAlias, NoneType
+from weakref import WeakKeyDictionary
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    IO,
+    Iterable,
+    List,
+    NamedTuple,
+    Sequence,
+    TypeVar,
+    Union,
+    cast,
+    get_args,
+    get_origin,
+)
+
+from generic.registry import (
+    ChainRegistry,
+    Registry,
+    SubclassAxis,
+    TypeAxis,
+    _import_all,
+    _name_of,
+    _names_of,
+    _overlays,
+)
+
+__all__ = ("multidispatch", "DispatchProfile", "RuleStats", "ArgTypesStats")
 
 T = TypeVar("T", bound=Union[Callable[..., Any], type])
-KeyType = Union[type, None]
+KeyType = Union[type, GenericAlias, str, None]
 
 logger = logging.getLogger(__name__)
 
 
-def multidispatch(*argtypes: KeyType) -> Callable[[T], FunctionDispatcher[T]]:
+def multidispatch(
+    *argtypes: KeyType, symmetric: bool = False
+) -> Callable[[T], FunctionDispatcher[T]]:
     """Declare function as multidispatch.
 
     This decorator takes ``argtypes`` argument types and replace
     decorated function with :class:`.FunctionDispatcher` object, which
     is responsible for multiple dispatch feature.
+
+    An argument type ``type[X]`` declares that the argument is a class,
+    dispatched on by its class hierarchy, instead of on its type. Cases
+    should be registered with ``type[...]`` for that argument as well.
+
+    Argument types can be given as ``"module:qualname"`` strings, so the
+    module defining them does not have to be imported to register a case.
+    See :class:`~generic.registry.Registry`.
+
+    With ``symmetric`` set, no argument takes precedence over the others: a
+    case is chosen if it's at least as specific for every argument as all
+    other matching cases, and a call is ambiguous (and raises
+    :class:`~generic.registry.AmbiguousLookupError`) if there is no such case.
     """
 
     def _replace_with_dispatcher(func: T) -> FunctionDispatcher[T]:
@@ -41,7 +85,12 @@ def multidispatch(*argtypes: KeyType) -> Callable[[T], FunctionDispatcher[T]]:
 
         dispatcher = cast(
             FunctionDispatcher[T],
-            functools.update_wrapper(FunctionDispatcher(argspec, len(argtypes)), func),
+            functools.update_wrapper(
+                FunctionDispatcher(
+                    argspec, len(argtypes), argtypes, symmetric=symmetric
+                ),
+                func,
+            ),
         )
         dispatcher.register_rule(func, *argtypes)
         return dispatcher
@@ -56,14 +105,31 @@ class FunctionDispatcher(Generic[T]):
     produced by :func:`.multidispatch` decorator.
 
     You should not manually create objects of this type.
+
+    Assign a :class:`DispatchProfile` to :attr:`profile` to collect
+    statistics on the rules called, and ``None`` to stop.
+
+    The rule for a tuple of argument types is looked up once, and cached
+    until a rule is registered. Write the argument types seen to a file with
+    :meth:`dump_argtypes`, and resolve their rules up front with
+    :meth:`warm_up` next time.
     """
 
     registry: Registry[T]
-
-    def __init__(self, argspec: inspect.FullArgSpec, params_arity: int) -> None:
+    profile: DispatchProfile | None = None
+
+    def __init__(
+        self,
+        argspec: inspect.FullArgSpec,
+        params_arity: int,
+        argtypes: Sequence[KeyType] = (),
+        symmetric: bool = False,
+    ) -> None:
         """Initialize dispatcher with ``argspec`` of type
         :class:`inspect.ArgSpec` and ``params_arity`` that represent number
-        params."""
+        params. Arguments declared as ``type[...]`` in ``argtypes`` are
+        dispatched on as classes. ``symmetric`` selects symmetric resolution
+        in the registry."""
         # Check if we have enough positional arguments for number of type params
         if _arity(argspec) < params_arity:
             raise TypeError(
@@ -74,8 +140,24 @@ class FunctionDispatcher(Generic[T]):
         self.argspec = argspec
         self.params_arity = params_arity
 
-        axis = [(f"arg_{n:d}", TypeAxis()) for n in range(params_arity)]
-        self.registry = Registry(*axis)
+        self.class_args = tuple(
+            n < len(argtypes) and _is_class_type(argtypes[n])
+            for n in range(params_arity)
+        )
+        axis = [
+            (f"arg_{n:d}", SubclassAxis() if is_class else TypeAxis())
+            for n, is_class in enumerate(self.class_args)
+        ]
+        self.registry = Registry(*axis, symmetric=symmetric)
+        self._has_class_args = any(self.class_args)
+        self._rules: Dict[tuple[Any, ...], T] = {}
+        self._rules_version = -1
+        # Rules cached per active overlay, with the overlay's version
+        self._overlay_rules: WeakKeyDictionary[
+            ChainRegistry[T], tuple[int, Dict[tuple[Any, ...], T]]
+        ] = WeakKeyDictionary()
+        # Argument types of all calls, in order of first call
+        self._argtypes_seen: Dict[tuple[Any, ...], None] = {}
 
     def check_rule(self, rule: T, *argtypes: KeyType) -> None:
         """Check if the argument types match wrt number of arguments.
@@ -88,6 +170,14 @@ class FunctionDispatcher(Generic[T]):
                 f"Wrong number of type parameters: have {len(argtypes)}, expected {self.params_arity}."
             )
 
+        # Check if classes are declared as type[...], and only classes
+        for n, (argtype, is_class) in enumerate(
+            zip(argtypes, self.class_args, strict=True)
+        ):
+            if argtype is not None and _is_class_type(argtype) != is_class:
+                expected = "type[...]" if is_class else "a type"
+                raise TypeError(f"Type parameter {n} should be {expected}.")
+
         # Check if we have the same argspec (by number of args)
         rule_argspec = inspect.getfullargspec(rule)
         left_spec = tuple(x and len(x) or 0 for x in rule_argspec[:4])
@@ -100,7 +190,7 @@ class FunctionDispatcher(Generic[T]):
     def register_rule(self, rule: T, *argtypes: KeyType) -> None:
         """Register new ``rule`` for ``argtypes``."""
         self.check_rule(rule, *argtypes)
-        self.registry.register(rule, *argtypes)
+        self.registry.register(rule, *map(_class_key, argtypes))
 
     def register(self, *argtypes: KeyType) -> Callable[[T], T]:
         """Decorator for registering new case for multidispatch.
@@ -122,15 +212,243 @@ class FunctionDispatcher(Generic[T]):
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         """Dispatch call to appropriate rule."""
         trimmed_args = args[: self.params_arity]
-        rule = self.registry.lookup(*trimmed_args)
+        if self._has_class_args:
+            argtypes = tuple(
+                arg if is_class or arg is None else type(arg)
+                for arg, is_class in zip(trimmed_args, self.class_args, strict=False)
+            )
+        else:
+            argtypes = tuple(map(type, trimmed_args))
+            if NoneType in argtypes:
+                # None skips the argument, like in the registry
+                argtypes = tuple(None if t is NoneType else t for t in argtypes)
+        rule = self._rule(argtypes)
         if not rule:
             logger.debug(self.registry._tree)
             raise TypeError(f"No available rule found for {trimmed_args!r}")
+        profile = self.profile
+        if profile is not None:
+            return profile.call(rule, argtypes, args, kwargs)
         return rule(*args, **kwargs)
 
+    def _rule(self, argtypes: tuple[Any, ...]) -> T | None:
+        """The rule for arguments of ``argtypes``, cached until the registry
+        changes. While an overlay of the registry is active, the rules are
+        cached per overlay, until one of its layers changes."""
+        registry = self.registry
+        overlays = _overlays.get()
+        if overlays is not None and registry in overlays:
+            return self._overlay_rule(overlays[registry], argtypes)
+        rules = self._rules
+        if self._rules_version != registry._version:
+            rules.clear()
+            self._rules_version = registry._version
+        rule = rules.get(argtypes)
+        if rule is None:
+            rule = next(registry._query_types(*argtypes), None)
+            if rule is not None:
+                rules[argtypes] = rule
+                self._argtypes_seen[argtypes] = None
+        return rule
+
+    def _overlay_rule(
+        self, overlay: ChainRegistry[T], argtypes: tuple[Any, ...]
+    ) -> T | None:
+        version = overlay._version
+        cached = self._overlay_rules.get(overlay)
+        if cached is None or cached[0] != version:
+            cached = self._overlay_rules[overlay] = (version, {})
+        rules = cached[1]
+        rule = rules.get(argtypes)
+        if rule is None:
+            rule = next(overlay._query_types(*argtypes), None)
+            if rule is not None:
+                rules[argtypes] = rule
+        return rule
+
+    def dump_argtypes(self, file: IO[str]) -> None:
+        """Write the argument types the dispatcher has been called with to
+        ``file``, to :meth:`warm_up` a dispatcher with.
+
+        Types are written by qualified name. Argument types that can not
+        be imported by name are left out.
+        """
+        argtypes = [_names_of(types) for types in list(self._argtypes_seen)]
+        json.dump({"argtypes": [names for names in argtypes if names]}, file)
+
+    def warm_up(self, file: IO[str], background: bool = False) -> int:
+        """Resolve the rules for the argument types written to ``file`` by
+        :meth:`dump_argtypes`, so first calls do not have to look them up.
+
+        The modules defining the types are imported, argument types that can
+        not be imported are skipped. If ``background`` is set, rules are
+        resolved in a separate thread. Returns the number of argument type
+        tuples to warm up.
+        """
+        argtypes = [
+            types
+            for types in map(_import_all, json.load(file)["argtypes"])
+            if types is not None
+        ]
+        if background:
+            threading.Thread(
+                target=self._warm_up,
+                args=(argtypes,),
+                name="generic-dispatch-warm-up",
+                daemon=True,
+            ).start()
+        else:
+            self._warm_up(argtypes)
+        return len(argtypes)
+
+    def _warm_up(self, argtypes: Iterable[tuple[Any, ...]]) -> None:
+        for types in argtypes:
+            try:
+                self._rule(types)
+            except TypeError:
+                # Ambiguous in a symmetric registry: raised on call
+                pass
+
+    def unused_rules(self) -> list[T]:
+        """Rules that have not been called since :attr:`profile` was
+        assigned or reset."""
+        profile = self.profile
+        if profile is None:
+            raise RuntimeError("Dispatcher is not profiled.")
+        called = profile.called_rules()
+        return [
+            rule
+            for _keys, rule, _multi in self.registry._registrations()
+            if rule not in called
+        ]
+
+
+class RuleStats(NamedTuple):
+    """Dispatch statistics of a rule."""
+
+    rule: Callable[..., Any]
+    calls: int
+    total_time: float
+
+
+class ArgTypesStats(NamedTuple):
+    """Dispatch statistics of a tuple of argument types."""
+
+    argtypes: tuple[type, ...]
+    rule: Callable[..., Any]
+    calls: int
+    total_time: float
+
+
+class DispatchProfile:
+    """Collects the number of calls and execution time per rule of a
+    dispatcher, and per tuple of argument types it's called with.
+
+    Assign a profile to :attr:`FunctionDispatcher.profile` to enable it,
+    and assign ``None`` to disable it again. A profile can be shared by
+    dispatchers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rules: Dict[Callable[..., Any], List[Any]] = {}
+        self._argtypes: Dict[tuple[type, ...], List[Any]] = {}
+
+    def call(
+        self,
+        rule: Callable[..., Any],
+        argtypes: tuple[type, ...],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Call ``rule`` and record its statistics."""
+        start = perf_counter()
+        try:
+            return rule(*args, **kwargs)
+        finally:
+            self._record(rule, argtypes, perf_counter() - start)
+
+    def _record(
+        self, rule: Callable[..., Any], argtypes: tuple[type, ...], elapsed: float
+    ) -> None:
+        with self._lock:
+            stats = self._rules.get(rule)
+            if stats is None:
+                self._rules[rule] = [1, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+            stats = self._argtypes.get(argtypes)
+            if stats is None:
+                self._argtypes[argtypes] = [1, elapsed, rule]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = rule
+
+    def snapshot(self) -> list[RuleStats]:
+        """Statistics per rule, the most time consuming rule first."""
+        with self._lock:
+            stats = [RuleStats(r, *s) for r, s in self._rules.items()]
+        return sorted(stats, key=lambda s: s.total_time, reverse=True)
+
+    def argtypes(self) -> list[ArgTypesStats]:
+        """Statistics per tuple of argument types, the most time consuming
+        first."""
+        with self._lock:
+            stats = [
+                ArgTypesStats(argtypes, rule, calls, t)
+                for argtypes, (calls, t, rule) in self._argtypes.items()
+            ]
+        return sorted(stats, key=lambda s: s.total_time, reverse=True)
+
+    def called_rules(self) -> set[Callable[..., Any]]:
+        """The rules called."""
+        with self._lock:
+            return set(self._rules)
+
+    def as_dict(self) -> dict[str, Any]:
+        """The statistics as a JSON serializable dict, with rules and types
+        by qualified name, as ``"module:qualname"``."""
+        return {
+            "rules": [
+                {
+                    "rule": _name_of(s.rule, strict=False),
+                    "calls": s.calls,
+                    "total_time": s.total_time,
+                }
+                for s in self.snapshot()
+            ],
+            "argtypes": [
+                {
+                    "argtypes": [_name_of(t, strict=False) for t in s.argtypes],
+                    "rule": _name_of(s.rule, strict=False),
+                    "calls": s.calls,
+                    "total_time": s.total_time,
+                }
+                for s in self.argtypes()
+            ],
+        }
+
+    def reset(self) -> None:
+        """Clear all collected statistics."""
+        with self._lock:
+            self._rules.clear()
+            self._argtypes.clear()
+
 
 def _arity(argspec: inspect.FullArgSpec) -> int:
     """Determinal positional arity of argspec."""
     args = argspec.args or []
     defaults: tuple[Any, ...] | list = argspec.defaults or []
     return len(args) - len(defaults)
+
+
+def _is_class_type(argtype: KeyType) -> bool:
+    """Check if ``argtype`` is ``type[...]``."""
+    return get_origin(argtype) is type
+
+
+def _class_key(argtype: KeyType) -> KeyType:
+    """The registry key for ``argtype``: ``X`` for ``type[X]``."""
+    return get_args(argtype)[0] if _is_class_type(argtype) else argtype
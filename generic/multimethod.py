@@ -8,7 +8,7 @@ import inspect
 import logging
 import threading
 import types
-from typing import Any, Callable, TypeVar, Union, cast
+from typing import Any, Callable, Sequence, TypeVar, Union, cast
 
 from generic.multidispatch import FunctionDispatcher, KeyType
 
@@ -20,7 +20,9 @@ T = TypeVar("T", bound=Union[Callable[..., Any], type])
 logger = logging.getLogger(__name__)
 
 
-def multimethod(*argtypes: KeyType) -> Callable[[T], MethodDispatcher[T]]:
+def multimethod(
+    *argtypes: KeyType, symmetric: bool = False
+) -> Callable[[T], MethodDispatcher[T]]:
     """Declare method as multimethod.
 
     This decorator works exactly the same as :func:`.multidispatch` decorator
@@ -38,7 +40,13 @@ def multimethod(*argtypes: KeyType) -> Callable[[T], MethodDispatcher[T]]:
         dispatcher = cast(
             MethodDispatcher,
             functools.update_wrapper(
-                MethodDispatcher(argspec, len(argtypes) + 1), func
+                MethodDispatcher(
+                    argspec,
+                    len(argtypes) + 1,
+                    (object, *argtypes),
+                    symmetric=symmetric,
+                ),
+                func,
             ),
         )
         dispatcher.register_unbound_rule(func, *argtypes)
@@ -68,8 +76,14 @@ class MethodDispatcher(FunctionDispatcher[T]):
     You should not manually create objects of this type.
     """
 
-    def __init__(self, argspec: inspect.FullArgSpec, params_arity: int) -> None:
-        super().__init__(argspec, params_arity)
+    def __init__(
+        self,
+        argspec: inspect.FullArgSpec,
+        params_arity: int,
+        argtypes: Sequence[KeyType] = (),
+        symmetric: bool = False,
+    ) -> None:
+        super().__init__(argspec, params_arity, argtypes, symmetric=symmetric)
 
         # some data, that should be local to thread of execution
         self.local = threading.local()
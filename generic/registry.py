@@ -2,62 +2,515 @@
 
 from __future__ import annotations
 
+import hashlib
+import importlib
+import importlib.machinery
+import json
+import logging
+import sys
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import takewhile
+from types import ModuleType
 from typing import (
     Any,
+    Callable,
     Dict,
     Generator,
     Generic,
+    IO,
+    Iterable,
     KeysView,
+    Mapping,
     Sequence,
+    Tuple,
     TypeVar,
     Union,
     Iterator,
+    cast,
 )
 
-__all__ = ("Registry", "SimpleAxis", "TypeAxis")
+__all__ = (
+    "Registry",
+    "ChainRegistry",
+    "AmbiguousLookupError",
+    "SimpleAxis",
+    "TypeAxis",
+    "SubclassAxis",
+    "RangeAxis",
+    "TopicAxis",
+)
 
 K = TypeVar("K")
+P = TypeVar("P")
 S = TypeVar("S")
 T = TypeVar("T")
 V = TypeVar("V")
-Axis = Union["SimpleAxis", "TypeAxis"]
+Axis = Union[
+    "SimpleAxis", "TypeAxis", "SubclassAxis", "RangeAxis", "TopicAxis", "_MroAxis"
+]
+Range = Tuple[float, float]
+
+logger = logging.getLogger(__name__)
+
+# Overlays activated in the current context, by the registry they overlay
+_overlays: ContextVar[Mapping[Registry[Any], ChainRegistry[Any]] | None] = ContextVar(
+    "generic_registry_overlays", default=None
+)
+
+
+class AmbiguousLookupError(TypeError):
+    """Raised by a symmetric registry if no registration is more specific
+    than all others."""
 
 
 class Registry(Generic[T]):
-    """Registry implementation."""
+    """Registry implementation.
+
+    By default registrations are ordered by specificity from left to right:
+    the first axis decides, later axes only order registrations with equal
+    keys on the axes before them. If ``symmetric`` is set, a registration
+    is more specific than another if it's at least as specific on every
+    axis. If no registration is more specific than all others, a lookup
+    raises :class:`AmbiguousLookupError`. Symmetric lookups are cached per
+    combination of types (or of the registered keys they match, for axes
+    that do not match on types).
 
-    def __init__(self, *axes: tuple[str, Axis]):
+    Keys on type and subclass axes can be given as ``"module:qualname"``
+    strings, to register for a class without importing its module. Such a
+    registration is pending until the module is imported by someone else,
+    and takes effect on the first lookup after that.
+    """
+
+    def __init__(self, *axes: tuple[str, Axis], symmetric: bool = False):
         self._tree: _TreeNode[T] = _TreeNode()
         self._axes = [axis for name, axis in axes]
         self._axes_dict = {name: (i, axis) for i, (name, axis) in enumerate(axes)}
+        self.symmetric = symmetric
+        # Incremented on every change, so cached lookups can tell if they
+        # are still up to date
+        self._version = 0
+        self._resolved: Dict[tuple[Any, ...], tuple[tuple[T, ...], bool]] = {}
+        self._resolved_version = 0
+        # Number of tree nodes per key, and the index of those keys, per axis
+        self._axis_keys: list[Dict[Any, int]] = [{} for _axis in axes]
+        self._axis_indexes: list[Any] = [None for _axis in axes]
+        self._deferred: _Deferred[tuple[T, Sequence[Any], bool]] = _Deferred()
+        # Set once a target is registered with ``multi``, lookups then
+        # flatten the collections of targets
+        self._has_multi = False
 
-    def register(self, target: T, *arg_keys: K, **kw_keys: K) -> None:
-        tree_node = self._tree
-        for key in self._align_with_axes(arg_keys, kw_keys):
-            tree_node = tree_node.setdefault(key, _TreeNode())
+    def overlay(self) -> ChainRegistry[T]:
+        """Create an overlay: a registry that adds registrations to this
+        registry, or overrides them, without changing this registry."""
+        axes = [(name, axis) for name, (_i, axis) in self._axes_dict.items()]
+        return ChainRegistry(Registry(*axes, symmetric=self.symmetric), self)
 
-        if tree_node.target is not None:
+    def register(
+        self, target: T, *arg_keys: K, multi: bool = False, **kw_keys: K
+    ) -> None:
+        """Register ``target`` for the keys.
+
+        If ``multi`` is set, ``target`` is added to the targets registered
+        for the keys with ``multi``, in order of registration. Otherwise a
+        registration for the same keys is an error.
+        """
+        aligned = self._align_with_axes(arg_keys, kw_keys)
+        for key, axis in zip(aligned, self._axes, strict=False):
+            if key is not None and isinstance(axis, RangeAxis):
+                axis.check_key(key)
+        keys = self._resolve_keys(aligned)
+        if keys is None:
+            self._deferred.add(
+                self._class_names(arg_keys, kw_keys),
+                (target, (arg_keys, kw_keys), multi),
+            )
+            return
+        tree_node = self._node(keys)
+        existing: Any = tree_node.target
+        if multi and (existing is None or type(existing) is _MultiTarget):
+            if existing is None:
+                existing = tree_node.target = cast(T, _MultiTarget())
+            existing.add(target)
+            self._has_multi = True
+        elif existing is None or _replaces(existing, target):
+            tree_node.target = target
+        else:
             raise ValueError(
                 f"Registration for {target} conflicts with existing registration {tree_node.target}."
             )
+        self._version += 1
 
-        tree_node.target = target
+    def _register_multi(self, targets: Iterable[T], *arg_keys: K) -> None:
+        """Register ``targets`` with ``multi`` for the keys, as one change.
+        The keys should not be class names."""
+        tree_node = self._node(self._align_with_axes(arg_keys, {}))
+        existing: Any = tree_node.target
+        if existing is None:
+            existing = tree_node.target = cast(T, _MultiTarget())
+        elif type(existing) is not _MultiTarget:
+            raise ValueError(
+                f"Registrations for {arg_keys} conflict with existing registration {existing}."
+            )
+        for target in targets:
+            existing.add(target)
+        self._has_multi = True
+        self._version += 1
+
+    def _node(self, keys: Sequence[Any]) -> _TreeNode[T]:
+        """The tree node for ``keys``, added if it's not there."""
+        tree_node = self._tree
+        for depth, key in enumerate(keys):
+            next_node = tree_node.get(key)
+            if next_node is None:
+                next_node = tree_node[key] = _TreeNode()
+                if tree_node.index is not None:
+                    tree_node.index.add(key)
+                self._add_axis_key(depth, key)
+            tree_node = next_node
+        return tree_node
+
+    def _add_axis_key(self, depth: int, key: Any) -> None:
+        counts = self._axis_keys[depth]
+        if key not in counts:
+            counts[key] = 0
+            index = self._axis_indexes[depth]
+            if index is not None:
+                index.add(key)
+        counts[key] += 1
+
+    def _remove_axis_key(self, depth: int, key: Any) -> None:
+        counts = self._axis_keys[depth]
+        counts[key] -= 1
+        if not counts[key]:
+            del counts[key]
+            self._axis_indexes[depth] = None
+
+    def _axis_matches(self, depth: int, obj: Any) -> tuple[Any, ...]:
+        """The keys registered on the axis at ``depth`` that match ``obj``,
+        from most to least specific."""
+        axis = self._axes[depth]
+        keys = self._axis_keys[depth]
+        if isinstance(axis, _IndexedAxis):
+            index = self._axis_indexes[depth]
+            if index is None:
+                index = self._axis_indexes[depth] = axis.index(keys.keys())
+            return tuple(index.matches(obj))
+        return tuple(axis.matches(obj, keys.keys()))
 
     def get_registration(self, *arg_keys: K, **kw_keys: K) -> T | None:
+        """The target registered for the keys, the first one if multiple
+        targets are registered."""
+        return next(iter(self.get_registrations(*arg_keys, **kw_keys)), None)
+
+    def get_registrations(self, *arg_keys: K, **kw_keys: K) -> tuple[T, ...]:
+        """All targets registered for the keys, in order of registration."""
+        keys = self._resolve_keys(self._align_with_axes(arg_keys, kw_keys))
+        if keys is None:
+            return tuple(
+                target
+                for target, pending, _multi in self._deferred
+                if pending == (arg_keys, kw_keys)
+            )
+        tree_node = self._tree
+        for key in keys:
+            if key not in tree_node:
+                return ()
+            tree_node = tree_node[key]
+
+        return _values(tree_node.target)
+
+    def discard(self, target: T, *arg_keys: K, **kw_keys: K) -> bool:
+        """Remove ``target`` from the targets registered for the keys.
+
+        Returns ``True`` if it was registered.
+        """
+        keys = self._resolve_keys(self._align_with_axes(arg_keys, kw_keys))
+        if keys is None:
+            removed = self._deferred.remove(
+                lambda item: item[1] == (arg_keys, kw_keys) and item[0] == target
+            )
+            return removed is not None
         tree_node = self._tree
-        for key in self._align_with_axes(arg_keys, kw_keys):
+        for key in keys:
+            if key not in tree_node:
+                return False
+            tree_node = tree_node[key]
+
+        existing: Any = tree_node.target
+        if type(existing) is _MultiTarget:
+            if target not in existing:
+                return False
+            if len(existing) > 1:
+                existing.remove(target)
+                self._version += 1
+                return True
+        elif existing is None or target not in (existing,):
+            return False
+        self.unregister(*keys)
+        return True
+
+    def unregister(self, *arg_keys: K, **kw_keys: K) -> T | None:
+        """Remove the registration for the keys and return its target.
+
+        All targets registered with ``multi`` are removed, the first one is
+        returned. Tree nodes that are left empty are removed as well.
+        """
+        keys = self._resolve_keys(self._align_with_axes(arg_keys, kw_keys))
+        if keys is None:
+            removed = self._deferred.remove_all(
+                lambda item: item[1] == (arg_keys, kw_keys)
+            )
+            return removed[0][0] if removed else None
+        tree_node = self._tree
+        path = []
+        for key in keys:
             if key not in tree_node:
                 return None
+            path.append((tree_node, key))
             tree_node = tree_node[key]
 
-        return tree_node.target
+        target = tree_node.target
+        tree_node.target = None
+        self._version += 1
+
+        for depth, (parent, key) in reversed(list(enumerate(path))):
+            node = parent[key]
+            if node or node.target is not None:
+                break
+            del parent[key]
+            parent.index = None
+            self._remove_axis_key(depth, key)
+
+        return next(iter(_values(target)), None)
+
+    def dump(self, file: IO[str]) -> None:
+        """Write a snapshot of the registrations to ``file``, to restore them
+        with :meth:`load`.
+
+        Targets and keys that are classes are written as qualified names,
+        so they should be importable. Other keys should be JSON
+        serializable. Pending registrations are included. The snapshot
+        contains a hash of the source of the modules they're defined in.
+        """
+        registrations = []
+        modules = set()
+        deferred = [
+            (self._align_with_axes(arg_keys, kw_keys), target, multi)
+            for target, (arg_keys, kw_keys), multi in self._deferred
+        ]
+        for keys, target, multi in [*self._registrations(), *deferred]:
+            name = _name_of(target)
+            modules.add(name.partition(":")[0])
+            modules.update(key.__module__ for key in keys if isinstance(key, type))
+            modules.update(
+                class_name.partition(":")[0]
+                for class_name in self._class_names(keys, {})
+            )
+            registration: Dict[str, Any] = {
+                "keys": [_encode_key(key) for key in keys],
+                "target": name,
+            }
+            if multi:
+                registration["multi"] = True
+            registrations.append(registration)
+        json.dump(
+            {
+                "modules": {module: _source_hash(module) for module in sorted(modules)},
+                "registrations": registrations,
+            },
+            file,
+        )
+
+    def load(self, file: IO[str]) -> bool:
+        """Restore registrations from a snapshot written by :meth:`dump`.
+
+        Targets are imported when they're first called, or when their
+        module registers them again. Classes on type and subclass axes are
+        not imported either, their registrations are pending until the
+        classes are imported. Registrations already present are kept. If
+        the source of a module changed since the snapshot was written,
+        nothing is restored and ``False`` is returned.
+        """
+        snapshot = json.load(file)
+        if any(
+            _source_hash(module) != source_hash
+            for module, source_hash in snapshot["modules"].items()
+        ):
+            return False
+        for registration in snapshot["registrations"]:
+            keys = [
+                _decode_key(key, axis)
+                for key, axis in zip(registration["keys"], self._axes, strict=False)
+            ]
+            name = registration["target"]
+            multi = registration.get("multi", False)
+            registered = self.get_registrations(*keys)
+            if multi and all(_name_or_none(t) != name for t in registered):
+                target = _LazyTarget(name, self, keys, multi)
+                self.register(cast(T, target), *keys, multi=True)
+            elif not (multi or registered):
+                target = _LazyTarget(name, self, keys)
+                self.register(cast(T, target), *keys)
+        return True
 
     def lookup(self, *arg_objs: V, **kw_objs: V) -> T | None:
         return next(self.query(*arg_objs, **kw_objs), None)
 
     def query(self, *arg_objs: V, **kw_objs: V) -> Iterator[T | None]:
+        """The targets registered for keys matching the objects, from the
+        most to the least specific keys. The targets registered with
+        ``multi`` for the same keys are in order of registration."""
+        overlays = _overlays.get()
+        if overlays is not None and self in overlays:
+            return overlays[self].query(*arg_objs, **kw_objs)
         objs = self._align_with_axes(arg_objs, kw_objs)
-        return filter(None, self._query(self._tree, objs, self._axes))
+        return self._targets(objs, self._axes, grouped=False)
+
+    def _query_grouped(self, *arg_objs: V) -> Iterator[tuple[T, ...]]:
+        """Like :meth:`query`, with the targets yielded as a tuple per
+        matching registration."""
+        overlays = _overlays.get()
+        if overlays is not None and self in overlays:
+            return overlays[self]._query_grouped(*arg_objs)
+        objs = self._align_with_axes(arg_objs, {})
+        return self._targets(objs, self._axes, grouped=True)
+
+    def _query_types(self, *types: Any, grouped: bool = False) -> Iterator[Any]:
+        """Like :meth:`query`, with the classes of the objects instead of
+        the objects on type axes. If ``grouped`` is set, the targets are
+        yielded as a tuple per matching registration."""
+        overlays = _overlays.get()
+        if overlays is not None and self in overlays:
+            return overlays[self]._query_types(*types, grouped=grouped)
+        axes = [
+            _MRO_AXIS if isinstance(axis, TypeAxis) else axis for axis in self._axes
+        ]
+        objs = self._align_with_axes(types, {})
+        return self._targets(objs, axes, grouped)
+
+    def _targets(
+        self, objs: Sequence[Any], axes: Sequence[Axis], grouped: bool
+    ) -> Iterator[Any]:
+        targets: Iterable[Any]
+        if self.symmetric:
+            targets = self._resolve_symmetric(objs, axes)
+        else:
+            targets = self._query(self._root(), objs, axes)
+        if grouped:
+            return _grouped(targets)
+        if self._has_multi:
+            return _flatten(targets)
+        return filter(None, targets)
+
+    def _root(self) -> _TreeNode[T]:
+        """The tree to query."""
+        self._register_ready()
+        return self._tree
+
+    def _register_ready(self) -> None:
+        if self._deferred:
+            self._register_deferred()
+
+    def _matching_paths(
+        self, objs: Sequence[Any], axes: Sequence[Axis]
+    ) -> Iterator[tuple[list[Any], T]]:
+        """Keys and targets of all registrations matching ``objs``."""
+        return _matching_paths([self._root()], objs, axes, [])
+
+    def _registrations(self) -> Iterator[tuple[list[Any], T, bool]]:
+        """Keys and targets of all registrations, and if they were
+        registered with ``multi``."""
+        return _registrations([self._root()], [])
+
+    def _register_deferred(self) -> None:
+        """Register pending registrations of which the classes have been
+        imported."""
+        for target, (arg_keys, kw_keys), multi in self._deferred.ready():
+            self.register(target, *arg_keys, multi=multi, **kw_keys)
+
+    def _resolve_keys(self, keys: Sequence[Any]) -> Sequence[Any] | None:
+        """Replace class names by classes, or return ``None`` if one of the
+        classes is not imported yet."""
+        if self._deferred:
+            self._register_deferred()
+        if not any(isinstance(key, str) for key in keys):
+            return keys
+        resolved = list(keys)
+        for i, (key, axis) in enumerate(zip(keys, self._axes, strict=False)):
+            if isinstance(key, str) and isinstance(axis, (TypeAxis, SubclassAxis)):
+                cls = _imported(key)
+                if cls is None:
+                    return None
+                resolved[i] = cls
+        return resolved
+
+    def _class_names(
+        self, arg_keys: Sequence[Any], kw_keys: dict[str, Any]
+    ) -> list[str]:
+        keys = self._align_with_axes(arg_keys, kw_keys)
+        return [
+            key
+            for key, axis in zip(keys, self._axes, strict=False)
+            if isinstance(key, str) and isinstance(axis, (TypeAxis, SubclassAxis))
+        ]
+
+    def _resolve_symmetric(
+        self, objs: Sequence[V | None], axes: Sequence[Axis]
+    ) -> tuple[T, ...]:
+        """Targets matching ``objs``, from most to least specific."""
+        self._register_ready()
+        if self._resolved_version != self._version:
+            self._resolved.clear()
+            self._resolved_version = self._version
+        # Objects that match the same keys resolve to the same targets
+        key = tuple(
+            None
+            if obj is None
+            else type(obj)
+            if isinstance(axis, TypeAxis)
+            else obj
+            if isinstance(axis, (_MroAxis, SubclassAxis)) and isinstance(obj, type)
+            else self._axis_matches(depth, obj)
+            for depth, (obj, axis) in enumerate(zip(objs, axes, strict=False))
+        )
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            resolved = self._resolved[key] = self._order(objs, axes)
+        targets, ambiguous = resolved
+        if ambiguous:
+            raise AmbiguousLookupError(
+                f"Ambiguous lookup for {objs!r}, none of {targets!r} is more specific"
+            )
+        return targets
+
+    def _order(
+        self, objs: Sequence[V | None], axes: Sequence[Axis]
+    ) -> tuple[tuple[T, ...], bool]:
+        """Order the registrations matching ``objs`` by specificity over all
+        axes, and tell if the most specific one is ambiguous."""
+        paths = list(self._matching_paths(objs, axes))
+        # Rank the keys per axis, by matching against all keys found there
+        ranks: list[Dict[Any, int]] = []
+        for i, (obj, axis) in enumerate(zip(objs, axes, strict=False)):
+            keys = dict.fromkeys(path[i] for path, _target in paths)
+            matches = [None] if obj is None else axis.matches(obj, keys.keys())
+            ranks.append({key: rank for rank, key in enumerate(matches)})
+        candidates = sorted(
+            (
+                (
+                    tuple(rank[key] for rank, key in zip(ranks, path, strict=True)),
+                    target,
+                )
+                for path, target in paths
+            ),
+            key=lambda candidate: (sum(candidate[0]), candidate[0]),
+        )
+        most_specific = [
+            c for c in candidates if not any(_dominates(o[0], c[0]) for o in candidates)
+        ]
+        return tuple(target for _rank, target in candidates), len(most_specific) > 1
 
     def _query(
         self, tree_node: _TreeNode[T], objs: Sequence[V | None], axes: Sequence[Axis]
@@ -77,8 +530,7 @@ class Registry(Generic[T]):
                     yield from self._query(next_node, objs[1:], axes[1:])
             else:
                 # Get matches on this axis and iterate from most to least specific
-                axis = axes[0]
-                for match_key in axis.matches(obj, tree_node.keys()):
+                for match_key in _node_matches(tree_node, axes[0], obj):
                     yield from self._query(tree_node[match_key], objs[1:], axes[1:])
 
     def _align_with_axes(
@@ -117,8 +569,549 @@ class Registry(Generic[T]):
         return aligned
 
 
+class ChainRegistry(Registry[T]):
+    """A registry made of layers of registries, from top to bottom.
+
+    Lookups find the most specific registration in any layer. If layers
+    have a registration for the same keys, the one in the top layer is
+    used. Registrations are added to and removed from the top layer.
+
+    Lookups walk the trees of the layers side by side, matching the keys
+    of each layer with its own index, so nothing is copied and a lookup
+    takes about as long as one in each layer. Symmetric lookups are cached
+    per combination of keys, until a layer changes. The layers should have
+    the same axes. Layers that are chain registries are replaced by their
+    layers.
+    """
+
+    def __init__(self, *layers: Registry[T]):
+        if not layers:
+            raise ValueError("A chain registry needs at least one layer.")
+        self.layers: list[Registry[T]] = []
+        for layer in layers:
+            if isinstance(layer, ChainRegistry):
+                self.layers.extend(layer.layers)
+            else:
+                self.layers.append(layer)
+        top = self.layers[0]
+        if any(
+            layer._axes_dict.keys() != top._axes_dict.keys() for layer in self.layers
+        ):
+            raise ValueError("All layers should have the same axes.")
+        self._axes = top._axes
+        self._axes_dict = top._axes_dict
+        self.symmetric = top.symmetric
+        self._resolved = {}
+        self._resolved_version = 0
+        self._deferred = _Deferred()
+
+    @property
+    def _version(self) -> int:  # type: ignore[override]
+        # Versions of layers only ever increase
+        return sum(layer._version for layer in self.layers)
+
+    @property
+    def _has_multi(self) -> bool:  # type: ignore[override]
+        return any(layer._has_multi for layer in self.layers)
+
+    def register(
+        self, target: T, *arg_keys: K, multi: bool = False, **kw_keys: K
+    ) -> None:
+        self.layers[0].register(target, *arg_keys, multi=multi, **kw_keys)
+
+    def _register_multi(self, targets: Iterable[T], *arg_keys: K) -> None:
+        self.layers[0]._register_multi(targets, *arg_keys)
+
+    def get_registration(self, *arg_keys: K, **kw_keys: K) -> T | None:
+        return self.layers[0].get_registration(*arg_keys, **kw_keys)
+
+    def get_registrations(self, *arg_keys: K, **kw_keys: K) -> tuple[T, ...]:
+        return self.layers[0].get_registrations(*arg_keys, **kw_keys)
+
+    def discard(self, target: T, *arg_keys: K, **kw_keys: K) -> bool:
+        return self.layers[0].discard(target, *arg_keys, **kw_keys)
+
+    def unregister(self, *arg_keys: K, **kw_keys: K) -> T | None:
+        return self.layers[0].unregister(*arg_keys, **kw_keys)
+
+    @contextmanager
+    def activate(self) -> Iterator[ChainRegistry[T]]:
+        """Use this registry for lookups in the bottom layer registry, in
+        the current context (thread or task) for the duration of the
+        ``with`` block."""
+        overlays = _overlays.get() or {}
+        token = _overlays.set({**overlays, self.layers[-1]: self})
+        try:
+            yield self
+        finally:
+            _overlays.reset(token)
+
+    def _roots(self) -> list[_TreeNode[T]]:
+        """The trees of the layers, from top to bottom."""
+        return [layer._root() for layer in self.layers]
+
+    def _register_ready(self) -> None:
+        for layer in self.layers:
+            layer._register_ready()
+
+    def _targets(
+        self, objs: Sequence[Any], axes: Sequence[Axis], grouped: bool
+    ) -> Iterator[Any]:
+        if self.symmetric:
+            return super()._targets(objs, axes, grouped)
+        targets = _query_layers(self._roots(), objs, axes)
+        if grouped:
+            return _grouped(targets)
+        if self._has_multi:
+            return _flatten(targets)
+        return filter(None, targets)
+
+    def _matching_paths(
+        self, objs: Sequence[Any], axes: Sequence[Axis]
+    ) -> Iterator[tuple[list[Any], T]]:
+        return _matching_paths(self._roots(), objs, axes, [])
+
+    def _axis_matches(self, depth: int, obj: Any) -> tuple[Any, ...]:
+        matched = {
+            key: None
+            for layer in self.layers
+            for key in layer._axis_matches(depth, obj)
+        }
+        return tuple(self._axes[depth].matches(obj, matched.keys()))
+
+    def _registrations(self) -> Iterator[tuple[list[Any], T, bool]]:
+        return _registrations(self._roots(), [])
+
+
+def _node_matches(tree_node: _TreeNode[Any], axis: Axis, obj: Any) -> Iterable[Any]:
+    """The keys of ``tree_node`` matching ``obj``, from most to least
+    specific."""
+    if isinstance(axis, _IndexedAxis):
+        index = tree_node.index
+        if index is None:
+            index = tree_node.index = axis.index(tree_node.keys())
+        matches: Iterable[Any] = index.matches(obj)
+        return matches
+    return axis.matches(obj, tree_node.keys())
+
+
+def _query_layers(
+    tree_nodes: list[_TreeNode[T]], objs: Sequence[Any], axes: Sequence[Axis]
+) -> Iterator[T | None]:
+    """Targets matching ``objs`` in the nodes of the layers of a chain
+    registry for the same keys, from most to least specific."""
+    if not objs:
+        yield _layered_target(tree_nodes)
+        return
+    obj = objs[0]
+    if obj is None:
+        match_keys: Iterable[Any] = [None]
+    elif len(tree_nodes) == 1:
+        match_keys = _node_matches(tree_nodes[0], axes[0], obj)
+    else:
+        axis = axes[0]
+        matched = {
+            key: None
+            for tree_node in tree_nodes
+            for key in _node_matches(tree_node, axis, obj)
+        }
+        # Order the keys matched in any of the layers
+        match_keys = axis.matches(obj, matched.keys())
+    for key in match_keys:
+        next_nodes = [tree_node[key] for tree_node in tree_nodes if key in tree_node]
+        if next_nodes:
+            yield from _query_layers(next_nodes, objs[1:], axes[1:])
+
+
+def _layered_target(tree_nodes: Iterable[_TreeNode[T]]) -> T | None:
+    """The target of the top layer that has one. Collections of targets of
+    consecutive layers are concatenated, from top to bottom."""
+    targets: list[Any] = [n.target for n in tree_nodes if n.target is not None]
+    if not targets:
+        return None
+    if type(targets[0]) is not _MultiTarget:
+        return cast(T, targets[0])
+    multi = takewhile(lambda t: type(t) is _MultiTarget, targets)
+    return cast(T, _MultiTarget(target for t in multi for target in t))
+
+
+def _matching_paths(
+    tree_nodes: list[_TreeNode[T]],
+    objs: Sequence[Any],
+    axes: Sequence[Axis],
+    path: list[Any],
+) -> Iterator[tuple[list[Any], T]]:
+    """Keys and targets of all registrations matching ``objs``, in the
+    nodes of the layers for ``path``."""
+    if len(path) == len(objs):
+        target = _layered_target(tree_nodes)
+        if target:
+            yield path, target
+        return
+    obj = objs[len(path)]
+    axis = axes[len(path)]
+    match_keys: Dict[Any, None] = {}
+    for tree_node in tree_nodes:
+        if obj is None:
+            if None in tree_node:
+                match_keys[None] = None
+        else:
+            match_keys.update(dict.fromkeys(axis.matches(obj, tree_node.keys())))
+    for key in match_keys:
+        next_nodes = [tree_node[key] for tree_node in tree_nodes if key in tree_node]
+        yield from _matching_paths(next_nodes, objs, axes, [*path, key])
+
+
+def _dominates(ranks: tuple[int, ...], other: tuple[int, ...]) -> bool:
+    """Check if ``ranks`` is at least as specific on all axes, and more
+    specific on one."""
+    return ranks != other and all(r <= o for r, o in zip(ranks, other, strict=True))
+
+
+class _Deferred(Generic[P]):
+    """Items that refer to classes by ``"module:qualname"``, deferred until
+    the modules defining the classes are imported."""
+
+    def __init__(self) -> None:
+        self._items: list[tuple[list[str], P]] = []
+        # Size of sys.modules when last checked, no module can have been
+        # imported since if it's the same
+        self._modules = -1
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[P]:
+        return (item for _names, item in self._items)
+
+    def add(self, names: list[str], item: P) -> None:
+        for name in names:
+            if not name.partition(":")[2]:
+                raise ValueError(f"Class name {name!r} should be 'module:qualname'")
+        self._items.append((names, item))
+        self._modules = -1
+
+    def remove(self, predicate: Callable[[P], bool]) -> P | None:
+        """Remove and return the first item matching ``predicate``."""
+        for i, (_names, item) in enumerate(self._items):
+            if predicate(item):
+                del self._items[i]
+                return item
+        return None
+
+    def remove_all(self, predicate: Callable[[P], bool]) -> list[P]:
+        """Remove and return the items matching ``predicate``."""
+        removed = [item for _names, item in self._items if predicate(item)]
+        self._items = [(n, item) for n, item in self._items if not predicate(item)]
+        return removed
+
+    def ready(self) -> list[P]:
+        """Remove and return the items of which all classes are imported."""
+        modules = len(sys.modules)
+        if modules == self._modules:
+            return []
+        self._modules = modules
+        ready = []
+        waiting = []
+        for names, item in self._items:
+            missing = [name for name in names if _imported(name) is None]
+            if not missing:
+                ready.append(item)
+                continue
+            loaded = [sys.modules.get(name.partition(":")[0]) for name in missing]
+            if any(m is not None and not _initializing(m) for m in loaded):
+                logger.warning(
+                    "Dropped %r: %s not defined by the imported module",
+                    item,
+                    ", ".join(missing),
+                )
+                continue
+            waiting.append((names, item))
+            if any(m is not None for m in loaded):
+                # A module is being imported, check again next time
+                self._modules = -1
+        self._items = waiting
+        return ready
+
+
+def _initializing(module: ModuleType) -> bool:
+    """Check if ``module`` is still being imported. Modules without a spec,
+    such as a script run as ``__main__``, may be."""
+    spec = getattr(module, "__spec__", None)
+    return spec is None or getattr(spec, "_initializing", False)
+
+
+def _imported(name: str) -> Any:
+    """The object named ``"module:qualname"``, or ``None`` if its module is
+    not imported (yet)."""
+    module, _, qualname = name.partition(":")
+    obj: Any = sys.modules.get(module)
+    for attr in qualname.split(".") if obj is not None else ():
+        obj = getattr(obj, attr, None)
+    return obj
+
+
+class _MultiTarget:
+    """The targets registered with ``multi`` for the same keys, in order of
+    registration. Targets are added and removed in constant time, and a
+    target that is already there is not added again. Iterating takes a
+    snapshot of the targets, so a lookup in progress is not affected by
+    changes."""
+
+    __slots__ = ("_targets", "_lazy", "_snapshot")
+
+    def __init__(self, targets: Iterable[Any] = ()):
+        self._targets: Dict[Any, None] = dict.fromkeys(targets)
+        # Placeholders restored from a snapshot, by name
+        self._lazy: Dict[str, _LazyTarget] = {
+            t.name: t for t in self._targets if isinstance(t, _LazyTarget)
+        }
+        self._snapshot: tuple[Any, ...] | None = None
+
+    def __contains__(self, target: Any) -> bool:
+        return target in self._targets
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.snapshot())
+
+    def __repr__(self) -> str:
+        return f"_MultiTarget({self.snapshot()!r})"
+
+    def snapshot(self) -> tuple[Any, ...]:
+        """The targets, as a tuple kept until the next change."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = tuple(self._targets)
+        return snapshot
+
+    def add(self, target: Any) -> None:
+        """Add ``target``, replacing its placeholder restored from a snapshot."""
+        placeholder = None
+        if self._lazy:
+            name = _name_or_none(target)
+            if name is not None:
+                placeholder = self._lazy.pop(name, None)
+        if placeholder is not None:
+            self._targets = {
+                target if t is placeholder else t: None for t in self._targets
+            }
+        else:
+            self._targets[target] = None
+            if isinstance(target, _LazyTarget):
+                self._lazy[target.name] = target
+        self._snapshot = None
+
+    def remove(self, target: Any) -> None:
+        del self._targets[target]
+        if isinstance(target, _LazyTarget):
+            self._lazy.pop(target.name, None)
+        self._snapshot = None
+
+
+def _replaces(existing: Any, target: Any) -> bool:
+    """Check if ``existing`` is the placeholder of ``target``."""
+    return isinstance(existing, _LazyTarget) and existing.name == _name_or_none(target)
+
+
+def _values(target: T | None) -> tuple[T, ...]:
+    """The targets in a tree node."""
+    if target is None:
+        return ()
+    if isinstance(target, _MultiTarget):
+        return target.snapshot()
+    return (target,)
+
+
+def _flatten(targets: Iterable[Any]) -> Iterator[Any]:
+    for target in targets:
+        if type(target) is _MultiTarget:
+            yield from target
+        elif target:
+            yield target
+
+
+def _grouped(targets: Iterable[Any]) -> Iterator[tuple[Any, ...]]:
+    for target in targets:
+        if type(target) is _MultiTarget:
+            yield target.snapshot()
+        elif target:
+            yield (target,)
+
+
+class _LazyTarget:
+    """Placeholder for a target restored from a snapshot. The target is
+    imported when it's first called, and then replaces the placeholder."""
+
+    def __init__(
+        self,
+        name: str,
+        registry: Registry[Any],
+        keys: Sequence[Any],
+        multi: bool = False,
+    ):
+        self.name = name
+        self.registry = registry
+        self.keys = keys
+        self.multi = multi
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def resolve(self) -> Any:
+        target = _import(self.name)
+        registry = self.registry
+        if self.multi:
+            if self in registry.get_registrations(*self.keys):
+                registry.register(target, *self.keys, multi=True)
+        elif registry.get_registration(*self.keys) is self:
+            registry.unregister(*self.keys)
+            registry.register(target, *self.keys)
+        return target
+
+    def __repr__(self) -> str:
+        return f"<lazy {self.name}>"
+
+
+def _registrations(
+    tree_nodes: list[_TreeNode[T]], path: list[Any]
+) -> Iterator[tuple[list[Any], T, bool]]:
+    """Keys and targets of all registrations in the nodes of the layers for
+    ``path``, and if they were registered with ``multi``."""
+    target = _layered_target(tree_nodes)
+    if type(target) is _MultiTarget:
+        for value in target:
+            yield path, value, True
+    elif target is not None:
+        yield path, target, False
+    keys = {key: None for tree_node in tree_nodes for key in tree_node}
+    for key in keys:
+        next_nodes = [tree_node[key] for tree_node in tree_nodes if key in tree_node]
+        yield from _registrations(next_nodes, [*path, key])
+
+
+def _name_of(obj: object, strict: bool = True) -> str:
+    """The qualified name of ``obj``, as ``"module:qualname"``.
+
+    If ``strict`` is off, the name is only for display: local objects are
+    named as well, and objects without a name by their repr.
+    """
+    if isinstance(obj, _LazyTarget):
+        return obj.name
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None)
+    if module and qualname and not (strict and "<locals>" in qualname):
+        return f"{module}:{qualname}"
+    if strict:
+        raise TypeError(f"{obj!r} can not be imported by qualified name")
+    return repr(obj)
+
+
+def _name_or_none(obj: object) -> str | None:
+    try:
+        return _name_of(obj)
+    except TypeError:
+        return None
+
+
+def _import(name: str) -> Any:
+    """Import an object by its qualified name."""
+    module, _, qualname = name.partition(":")
+    obj: Any = importlib.import_module(module)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _names_of(objs: Iterable[object]) -> list[str | None] | None:
+    """The qualified names of ``objs``, or ``None`` if one of them can not
+    be imported by name. ``None`` is kept."""
+    try:
+        return [None if obj is None else _name_of(obj) for obj in objs]
+    except TypeError:
+        return None
+
+
+def _import_all(names: Iterable[str | None]) -> tuple[Any, ...] | None:
+    """Import objects by qualified name, or return ``None`` if one of them
+    can not be imported."""
+    try:
+        return tuple(None if name is None else _import(name) for name in names)
+    except (ImportError, AttributeError):
+        return None
+
+
+def _encode_key(key: object) -> object:
+    if isinstance(key, type):
+        return ["type", _name_of(key)]
+    if isinstance(key, tuple):
+        return ["tuple", [_encode_key(k) for k in key]]
+    return key
+
+
+def _decode_key(key: Any, axis: Axis | None = None) -> object:
+    """Decode a key for ``axis``. Classes are kept as names on type and
+    subclass axes, to be registered once they're imported."""
+    if _is_tagged(key, "type"):
+        if isinstance(axis, (TypeAxis, SubclassAxis)):
+            return key[1]
+        return _import(key[1])
+    if _is_tagged(key, "tuple"):
+        return tuple(_decode_key(k) for k in key[1])
+    return key
+
+
+def _is_tagged(key: object, tag: str) -> bool:
+    return isinstance(key, list) and key[0] == tag
+
+
+def _source_hash(module: str) -> str:
+    """Hash of the source file of ``module``, without importing it or its
+    parent packages. Modules without a source file hash to ``""``."""
+    path = _source_path(module)
+    if path is None:
+        return ""
+    try:
+        with open(path, "rb") as source:
+            return hashlib.sha256(source.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def _source_path(module: str) -> str | None:
+    """The source file of ``module``, from the module if it's imported, or
+    else found on the import path."""
+    loaded = sys.modules.get(module)
+    if loaded is not None:
+        return getattr(loaded, "__file__", None)
+    search_path: list[str] | None = None
+    name = ""
+    spec = None
+    for part in module.split("."):
+        name = f"{name}.{part}" if name else part
+        package = sys.modules.get(name)
+        if package is not None and name != module:
+            search_path = getattr(package, "__path__", None)
+            if search_path is None:
+                return None
+            continue
+        spec = importlib.machinery.PathFinder.find_spec(name, search_path)
+        if spec is None:
+            return None
+        search_path = spec.submodule_search_locations
+        if search_path is None and name != module:
+            return None
+    if spec is None or not spec.has_location:
+        return None
+    return spec.origin
+
+
 class _TreeNode(Generic[T], Dict[Any, Any]):
     target: T | None = None
+    # Lookup structure for the keys of the node, used by some axes
+    index: Any = None
 
     def __str__(self) -> str:
         return f"<TreeNode {self.target} {dict.__str__(self)}>"
@@ -153,3 +1146,213 @@ class TypeAxis:
         for key in type(obj).mro():
             if key in keys:
                 yield key
+
+
+class _MroAxis:
+    """Matches a class and its super classes, like :class:`TypeAxis` matches
+    an instance of the class."""
+
+    def matches(self, obj: Any, keys: KeysView[type | None]) -> Iterator[type]:
+        for key in obj.__mro__:
+            if key in keys:
+                yield key
+
+
+_MRO_AXIS = _MroAxis()
+
+
+class _IndexedAxis:
+    """An axis that looks up matching keys in an index of the keys of a tree
+    node. Within a registry, keys added to the node are added to its index,
+    the index is rebuilt when keys are removed from the node."""
+
+    def matches(self, obj: Any, keys: KeysView[Any]) -> Generator[object, None, None]:
+        yield from self.index(keys).matches(obj)
+
+    def index(self, keys: Iterable[object]) -> Any:
+        raise NotImplementedError
+
+
+class SubclassAxis(_IndexedAxis):
+    """An axis which matches classes: an object that is a class matches the
+    class and its super classes, in method resolution order. Objects that
+    are not a class do not match.
+
+    Within a registry, the matches are cached per class.
+    """
+
+    def index(self, keys: Iterable[object]) -> _SubclassIndex:
+        return _SubclassIndex(keys)
+
+
+class _SubclassIndex:
+    """Matching keys per class, computed when the class is first looked
+    up."""
+
+    def __init__(self, keys: Iterable[object]):
+        self.keys = {key for key in keys if isinstance(key, type)}
+        self.cache: Dict[type, Tuple[type, ...]] = {}
+
+    def add(self, key: object) -> None:
+        if isinstance(key, type):
+            self.keys.add(key)
+            self.cache.clear()
+
+    def matches(self, obj: object) -> Sequence[type]:
+        if not isinstance(obj, type):
+            return ()
+        matches = self.cache.get(obj)
+        if matches is None:
+            keys = self.keys
+            matches = self.cache[obj] = tuple(k for k in obj.__mro__ if k in keys)
+        return matches
+
+
+class RangeAxis(_IndexedAxis):
+    """An axis where the keys are ranges of numbers: ``(low, high)`` tuples.
+    An object matches the ranges for which ``low <= obj < high``, from the
+    narrowest to the widest range. Use ``math.inf`` for ranges without lower
+    or upper bound.
+
+    Within a registry, ranges are looked up in a segment tree of the ranges
+    registered on a tree node. Looking up an object that matches ``k`` of
+    ``R`` ranges takes O(log R + k log k) time, plus the time to check the
+    ranges registered since the tree was built.
+    """
+
+    def index(self, keys: Iterable[object]) -> _RangeIndex:
+        return _RangeIndex(keys)
+
+    def check_key(self, key: object) -> None:
+        """Raise :class:`ValueError` if ``key`` is not a ``(low, high)``
+        range with ``low < high``, which no object would match."""
+        try:
+            valid = isinstance(key, tuple) and len(key) == 2 and key[0] < key[1]
+        except TypeError:
+            valid = False
+        if not valid:
+            raise ValueError(f"Range {key!r} should be a (low, high) tuple, low < high")
+
+
+class _RangeIndex:
+    """Segment tree of ranges.
+
+    The leaves are the segments between the sorted range boundaries. A
+    range is stored in the O(log R) nodes that together cover the segments
+    it contains, so the tree takes O(R log R) space and time to build, and
+    the ranges containing a segment are found on the path from its leaf to
+    the root.
+
+    Ranges added later are kept apart and checked one by one, until there
+    are more than about the square root of the number of ranges in the
+    tree, which is then rebuilt.
+    """
+
+    def __init__(self, keys: Iterable[object]):
+        self._build(
+            [
+                key
+                for key in keys
+                if isinstance(key, tuple) and len(key) == 2 and key[0] < key[1]
+            ]
+        )
+
+    def _build(self, ranges: list[Range]) -> None:
+        self.ranges = ranges
+        self.added: list[Range] = []
+        self.boundaries = boundaries = sorted({bound for r in ranges for bound in r})
+        # Leaf i is the segment from boundaries[i] to boundaries[i + 1]
+        self.size = size = max(len(boundaries) - 1, 0)
+        self.nodes: list[list[Range]] = [[] for _ in range(2 * size)]
+        for r in ranges:
+            low = bisect_left(boundaries, r[0]) + size
+            high = bisect_left(boundaries, r[1]) + size
+            while low < high:
+                if low & 1:
+                    self.nodes[low].append(r)
+                    low += 1
+                if high & 1:
+                    high -= 1
+                    self.nodes[high].append(r)
+                low >>= 1
+                high >>= 1
+
+    def add(self, key: object) -> None:
+        if isinstance(key, tuple) and len(key) == 2 and key[0] < key[1]:
+            self.added.append(key)
+            if len(self.added) ** 2 > max(len(self.ranges), 256):
+                self._build(self.ranges + self.added)
+
+    def matches(self, obj: float) -> Sequence[Range]:
+        matches = [r for r in self.added if r[0] <= obj < r[1]]
+        i = bisect_right(self.boundaries, obj) - 1
+        if 0 <= i < self.size:
+            i += self.size
+            while i:
+                matches.extend(self.nodes[i])
+                i >>= 1
+        matches.sort(key=lambda r: (r[1] - r[0], r[0]))
+        return matches
+
+
+class TopicAxis(_IndexedAxis):
+    """An axis for dotted topics, such as ``"model.element.changed"``. A key
+    is a topic, or a wildcard: a topic prefix followed by ``".*"``, which
+    matches all topics below the prefix. The key ``"*"`` matches any topic.
+
+    An object matches the equal topic first, then the wildcards from the
+    longest to the shortest prefix. Within a registry, keys are looked up in
+    a trie of topic segments, so matching takes time in proportion to the
+    number of segments of the topic.
+    """
+
+    def index(self, keys: Iterable[object]) -> _TopicTrie:
+        return _TopicTrie(keys)
+
+
+class _TopicTrie:
+    """Trie of topic segments, with the topic and wildcard keys ending at
+    each node."""
+
+    def __init__(self, keys: Iterable[object]):
+        self.children: Dict[str, _TopicTrie] = {}
+        self.topic: str | None = None
+        self.wildcard: str | None = None
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: object) -> None:
+        if not isinstance(key, str):
+            return
+        segments = key.split(".")
+        wildcard = segments[-1] == "*"
+        if wildcard:
+            del segments[-1]
+        node = self
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _TopicTrie(())
+            node = child
+        if wildcard:
+            node.wildcard = key
+        else:
+            node.topic = key
+
+    def matches(self, obj: object) -> list[str]:
+        if not isinstance(obj, str):
+            return []
+        matches = []
+        node = self
+        for segment in obj.split("."):
+            if node.wildcard is not None:
+                matches.append(node.wildcard)
+            child = node.children.get(segment)
+            if child is None:
+                break
+            node = child
+        else:
+            if node.topic is not None:
+                matches.append(node.topic)
+        matches.reverse()
+        return matches
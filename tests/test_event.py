@@ -2,17 +2,23 @@
 
 from __future__ import annotations
 
+import gc
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 
 from generic.event import Manager
+from generic.registry import TopicAxis
 
 
 def make_handler(effect: object) -> Callable[[Event], None]:
     return lambda e: e.effects.append(effect)
 
 
-def create_manager():
-    return Manager()
+def create_manager(**kwargs):
+    return Manager(**kwargs)
 
 
 def test_subscribe_single_event():
@@ -157,8 +163,523 @@ def test_unsubscribe_event_inheritance():
     assert "handler2" in eb.effects
 
 
+def test_parallel_handlers_run_in_executor():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def handler(e):
+        barrier.wait()
+        e.effects.append(threading.current_thread())
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        events = Manager(executor=executor)
+        events.subscribe(handler, EventA, parallel=True)
+        events.subscribe(lambda e: handler(e), EventA, parallel=True)
+        e = EventA()
+        events.handle(e)
+
+    assert len(e.effects) == 2
+    assert threading.current_thread() not in e.effects
+
+
+def test_parallel_handlers_without_executor():
+    events = create_manager()
+    events.subscribe(make_handler("handler1"), EventA, parallel=True)
+    e = EventA()
+    events.handle(e)
+    assert e.effects == ["handler1"]
+
+
+class Listener:
+    def on_event(self, e):
+        e.effects.append(self)
+
+
+def test_weak_subscription_is_pruned():
+    events = create_manager()
+    listener = Listener()
+    events.subscribe(listener.on_event, EventA, weak=True)
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == [listener]
+
+    del e, listener
+    gc.collect()
+
+    assert not events.registry.get_registration(EventA)
+    e = EventA()
+    events.handle(e)
+    assert e.effects == []
+
+
+def test_weak_subscription_of_function():
+    events = create_manager()
+    handler = make_handler("handler1")
+    events.subscribe(handler, EventA, weak=True)
+
+    del handler
+    gc.collect()
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == []
+
+
+def test_unsubscribe_weak_subscription():
+    events = create_manager()
+    listener = Listener()
+    events.subscribe(listener.on_event, EventA, weak=True)
+    events.unsubscribe(listener.on_event, EventA)
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == []
+
+
+def test_unsubscribe_weak_exact_subscription():
+    events = create_manager()
+    listener = Listener()
+    other = Listener()
+    events.subscribe(listener.on_event, EventA, weak=True, exact=True)
+    events.subscribe(other.on_event, EventA, exact=True)
+    events.unsubscribe(listener.on_event, EventA, exact=True)
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == [other]
+
+
+def test_resubscribe_strong_replaces_weak_subscription():
+    events = create_manager()
+    listener = Listener()
+    events.subscribe(listener.on_event, EventA, weak=True)
+    events.subscribe(listener.on_event, EventA)
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == [listener]
+
+
+def test_subscribe_to_source():
+    events = create_manager()
+    source1 = object()
+    source2 = object()
+    events.subscribe(make_handler("handler1"), EventA, source=source1)
+    events.subscribe(make_handler("handler2"), EventA, source=source2)
+    events.subscribe(make_handler("handler3"), Event)
+
+    e = EventB(source1)
+    events.handle(e)
+    assert e.effects == ["handler1", "handler3"]
+
+    e = EventB(source2)
+    events.handle(e)
+    assert e.effects == ["handler2", "handler3"]
+
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler3"]
+
+
+def test_unhashable_source_has_no_source_subscriptions():
+    events = create_manager()
+    events.subscribe(make_handler("handler1"), EventA, source=object())
+    events.subscribe(make_handler("handler2"), EventA)
+
+    e = EventA([])
+    events.handle(e)
+    assert e.effects == ["handler2"]
+
+
+def test_unsubscribe_from_source_releases_source():
+    events = create_manager()
+    source = object()
+    handler = make_handler("handler1")
+    events.subscribe(handler, EventA, source=source)
+    events.unsubscribe(handler, EventA, source=source)
+
+    e = EventA(source)
+    events.handle(e)
+    assert e.effects == []
+    assert events.registry.get_registration(EventA, source) is None
+
+
+def test_custom_source_attribute():
+    events = create_manager(source_attribute="element")
+    element = object()
+    events.subscribe(make_handler("handler1"), ElementEvent, source=element)
+
+    e = ElementEvent(element)
+    events.handle(e)
+    assert e.effects == ["handler1"]
+
+
+def test_handlers_run_in_order_of_subscription():
+    events = create_manager()
+    for i in range(10):
+        events.subscribe(make_handler(i), EventA)
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == list(range(10))
+
+
+def test_priority_across_event_hierarchy():
+    events = create_manager()
+    events.subscribe(make_handler("low"), EventB, priority=-1)
+    events.subscribe(make_handler("specific"), EventB)
+    events.subscribe(make_handler("generic"), Event)
+    events.subscribe(make_handler("high"), Event, priority=10)
+
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["high", "specific", "generic", "low"]
+
+
+def test_priority_via_decorator():
+    events = create_manager()
+    events.subscriber(EventA)(make_handler("handler1"))
+    events.subscriber(EventA, priority=1)(make_handler("handler2"))
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == ["handler2", "handler1"]
+
+
+def test_subscribe_after_handling_updates_handlers():
+    events = create_manager()
+    events.subscribe(make_handler("handler1"), EventA)
+    events.handle(EventB())
+
+    events.subscribe(make_handler("handler2"), Event, priority=1)
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler2", "handler1"]
+
+    handler3 = make_handler("handler3")
+    events.subscribe(handler3, EventB)
+    events.unsubscribe(handler3, EventB)
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler2", "handler1"]
+
+
+def test_handle_many():
+    events = create_manager()
+    events.subscribe(make_handler("handler1"), EventA)
+    events.subscribe(make_handler("handler2"), EventC)
+
+    ea, eb, ec = EventA(), EventB(), EventC()
+    events.handle_many(iter([ea, eb, ec]))
+    assert ea.effects == ["handler1"]
+    assert eb.effects == ["handler1"]
+    assert ec.effects == ["handler2"]
+
+
+def test_handle_many_streams_events():
+    events = create_manager()
+    handled: list[Event] = []
+    events.subscribe(handled.append, EventA)
+
+    def generate():
+        for i in range(3):
+            yield EventA()
+            assert len(handled) == i + 1
+
+    events.handle_many(generate())
+    assert len(handled) == 3
+
+
+def test_handle_many_with_batch_handler():
+    events = create_manager()
+    batches: list[list[Event]] = []
+    events.subscribe(batches.append, EventA, batch=True)
+    events.subscribe(make_handler("handler1"), EventA)
+
+    ea, eb, ec = EventA(), EventB(), EventC()
+    events.handle_many([ea, ec, eb])
+    assert batches == [[ea, eb]]
+    assert ea.effects == ["handler1"]
+    assert eb.effects == ["handler1"]
+
+
+def test_handle_single_event_with_batch_handler():
+    events = create_manager()
+    batches: list[list[Event]] = []
+    events.subscribe(batches.append, EventA, batch=True)
+
+    e = EventA()
+    events.handle(e)
+    assert batches == [[e]]
+
+
+def test_subscribe_many():
+    events = create_manager()
+    handler1 = make_handler("handler1")
+    handler2 = make_handler("handler2")
+    events.handle(EventB())
+
+    events.subscribe_many([(handler1, EventA), (handler2, EventB)])
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler2", "handler1"]
+
+    events.unsubscribe_many([(handler1, EventA), (handler2, EventB)])
+    e = EventB()
+    events.handle(e)
+    assert e.effects == []
+
+
+def test_subscribe_many_registers_once_per_event_type():
+    events = create_manager()
+    handlers = [make_handler(f"handler{i}") for i in range(3)]
+    version = events.registry._version
+
+    events.subscribe_many(
+        [(handlers[0], EventA), (handlers[1], EventA), (handlers[0], EventA)]
+        + [(handlers[2], EventB)]
+    )
+    assert events.registry._version == version + 2
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == ["handler1", "handler0"]
+
+
+def test_subscribe_many_to_source():
+    events = create_manager()
+    source = object()
+    handler = make_handler("handler1")
+
+    events.subscribe_many([(handler, EventA)], source=source)
+    e = EventB(source)
+    events.handle(e)
+    assert e.effects == ["handler1"]
+
+    events.unsubscribe_many([(handler, EventA)], source=source)
+    assert events.registry.get_registration(EventA, source) is None
+
+
+def test_subscription_scope():
+    events = create_manager()
+    events.subscribe(make_handler("handler1"), EventA)
+
+    with events.subscription_scope() as scope:
+        scope.subscribe(make_handler("handler2"), EventA, priority=1)
+        scope.subscribe_many([(make_handler("handler3"), EventB)])
+        e = EventB()
+        events.handle(e)
+        assert e.effects == ["handler2", "handler3", "handler1"]
+
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler1"]
+
+
+def test_exact_subscription():
+    events = create_manager()
+    handler = make_handler("exact")
+    events.subscribe(handler, EventA, exact=True)
+    events.subscribe(make_handler("handler1"), EventA, priority=-1)
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == ["exact", "handler1"]
+
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler1"]
+
+    events.unsubscribe(handler, EventA, exact=True)
+    e = EventA()
+    events.handle(e)
+    assert e.effects == ["handler1"]
+    assert events._exact == {}
+
+
+def test_exact_subscription_to_source():
+    events = create_manager()
+    source = object()
+    handler = make_handler("exact")
+    events.subscribe(handler, EventA, source=source, exact=True)
+
+    e = EventA(source)
+    events.handle(e)
+    assert e.effects == ["exact"]
+
+    e = EventA()
+    events.handle(e)
+    assert e.effects == []
+
+    events.unsubscribe(handler, EventA, source=source, exact=True)
+    assert source not in events._sources
+
+
+def test_handler_subscribed_to_base_and_subtype_runs_twice():
+    events = create_manager()
+    handler = make_handler("handler1")
+    events.subscribe(handler, EventA)
+    events.subscribe(handler, Event)
+
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler1", "handler1"]
+
+
+def test_deduplicate_handlers():
+    events = create_manager(deduplicate=True)
+    handler = make_handler("handler1")
+    events.subscribe(handler, Event)
+    events.subscribe(make_handler("handler2"), EventB)
+    events.subscribe(handler, EventA, priority=1)
+    events.subscribe(handler, EventB, exact=True)
+
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["handler1", "handler2"]
+
+    ec = EventC()
+    events.handle(ec)
+    assert ec.effects == ["handler1"]
+
+
+def test_iter_handle():
+    events = create_manager()
+    events.subscribe(lambda e: "first", EventA, priority=1)
+    events.subscribe(make_handler("handler2"), Event)
+
+    e = EventB()
+    results = [result for _handler, result in events.iter_handle(e)]
+    assert results == ["first", None]
+    assert e.effects == ["handler2"]
+
+
+def test_iter_handle_stops_early():
+    events = create_manager()
+
+    def veto(e):
+        return False
+
+    events.subscribe(veto, EventA)
+    events.subscribe(make_handler("handler2"), Event)
+
+    e = EventA()
+    vetoed_by = next(h for h, result in events.iter_handle(e) if result is False)
+    assert vetoed_by is veto
+    assert e.effects == []
+
+
+def test_iter_handle_yields_subscribed_handlers():
+    events = create_manager()
+    listener = Listener()
+    batches: list[list[Event]] = []
+    events.subscribe(listener.on_event, EventA, weak=True)
+    events.subscribe(batches.append, EventA, batch=True)
+
+    handlers = [handler for handler, _result in events.iter_handle(EventA())]
+    assert handlers == [listener.on_event, batches.append]
+
+
+def test_subscribe_to_topics():
+    events = create_manager(source_axis=TopicAxis())
+    events.subscribe(make_handler("model"), Event, source="model.*")
+    events.subscribe(make_handler("element"), Event, source="model.element.*")
+    events.subscribe(make_handler("changed"), Event, source="model.element.changed")
+    events.subscribe(make_handler("any"), Event)
+
+    e = Event("model.element.changed")
+    events.handle(e)
+    assert e.effects == ["changed", "element", "model", "any"]
+
+    e = Event("model.diagram")
+    events.handle(e)
+    assert e.effects == ["model", "any"]
+
+
+def test_subscribe_to_topic_updates_cached_handlers():
+    events = create_manager(source_axis=TopicAxis())
+    events.handle(EventA("model.element"))
+
+    handler = make_handler("model")
+    events.subscribe(handler, Event, source="model.*")
+    e = EventA("model.element")
+    events.handle(e)
+    assert e.effects == ["model"]
+
+    events.unsubscribe(handler, Event, source="model.*")
+    e = EventA("model.element")
+    events.handle(e)
+    assert e.effects == []
+
+
+def test_topic_sources_share_cached_handlers():
+    events = create_manager(source_axis=TopicAxis())
+    events.subscribe(make_handler("model"), Event, source="model.*")
+    events.subscribe(make_handler("exact"), EventA, source="model.a", exact=True)
+
+    for i in range(100):
+        e = EventA(f"model.element{i}")
+        events.handle(e)
+        assert e.effects == ["model"]
+    e = EventA("model.a")
+    events.handle(e)
+    assert e.effects == ["exact", "model"]
+
+    assert len(events._handler_cache) == 2
+
+
+def test_warm_up_handlers():
+    events = create_manager()
+    events.subscribe(make_handler("a"), EventA)
+    events.subscribe(make_handler("exact b"), EventB, exact=True)
+    events.handle(EventB())
+    events.handle(EventC())
+    file = io.StringIO()
+    events.dump_event_types(file)
+    file.seek(0)
+
+    warm = create_manager()
+    warm.subscribe(make_handler("a"), EventA)
+    warm.subscribe(make_handler("exact b"), EventB, exact=True)
+    assert warm.warm_up(file) == 2
+
+    assert set(warm._handler_cache) == {EventB, EventC}
+    e = EventB()
+    warm.handle(e)
+    assert e.effects == ["exact b", "a"]
+
+
+def test_warm_up_in_background():
+    events = create_manager()
+    events.subscribe(make_handler("a"), EventA)
+    file = io.StringIO(
+        json.dumps({"event_types": [f"{__name__}:EventB", "no_such_module:Event"]})
+    )
+
+    assert events.warm_up(file, background=True) == 1
+    for thread in threading.enumerate():
+        if thread.name == "generic-event-warm-up":
+            thread.join()
+
+    assert EventB in events._handler_cache
+    events.subscribe(make_handler("b"), EventB)
+    e = EventB()
+    events.handle(e)
+    assert e.effects == ["b", "a"]
+
+
+def test_dump_event_types_keeps_warmed_up_types():
+    events = create_manager()
+    events.warm_up(io.StringIO(json.dumps({"event_types": [f"{__name__}:EventA"]})))
+    file = io.StringIO()
+    events.dump_event_types(file)
+
+    assert json.loads(file.getvalue()) == {"event_types": [f"{__name__}:EventA"]}
+
+
 class Event:
-    def __init__(self) -> None:
+    def __init__(self, source: object = None) -> None:
+        self.source = source
         self.effects: list[object] = []
 
 
@@ -180,3 +701,9 @@ class EventD(EventA, EventC):
 
 class EventE(EventD, EventA):
     pass
+
+
+class ElementEvent(Event):
+    def __init__(self, element: object) -> None:
+        super().__init__()
+        self.element = element
@@ -0,0 +1,311 @@
+"""Tests for :class:`generic.event.AsyncManager`."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from sys import version_info
+
+import pytest
+
+if version_info < (3, 11):
+    from exceptiongroup import ExceptionGroup
+
+from generic.event import AsyncManager, EventTrace, HandlerMonitor, Manager
+
+
+class Event:
+    def __init__(self) -> None:
+        self.effects: list[object] = []
+
+
+class EventA(Event):
+    pass
+
+
+def test_sync_and_async_handlers():
+    events = AsyncManager()
+
+    async def async_handler(e):
+        await asyncio.sleep(0)
+        e.effects.append("async")
+
+    def sync_handler(e):
+        e.effects.append("sync")
+
+    events.subscribe(async_handler, Event)
+    events.subscribe(sync_handler, EventA)
+
+    e = EventA()
+    asyncio.run(events.handle(e))
+
+    assert e.effects == ["sync", "async"]
+
+
+def test_coroutine_handlers_run_concurrently():
+    events = AsyncManager()
+    running = 0
+    max_running = 0
+
+    async def handler(e):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for _ in range(5):
+        events.subscribe(functools.partial(handler), Event)
+
+    asyncio.run(events.handle(Event()))
+
+    assert max_running == 5
+
+
+def test_concurrency_limit():
+    events = AsyncManager(concurrency=2)
+    running = 0
+    max_running = 0
+
+    async def handler(e):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for _ in range(5):
+        events.subscribe(functools.partial(handler), Event)
+
+    asyncio.run(events.handle(Event()))
+
+    assert max_running == 2
+
+
+def test_concurrency_limit_over_events():
+    events = AsyncManager(concurrency=1)
+    running = 0
+    max_running = 0
+
+    async def handler(e):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    events.subscribe(handler, Event)
+
+    async def handle_concurrently():
+        await asyncio.gather(*(events.handle(Event()) for _ in range(5)))
+        await events.handle_many([Event(), Event()])
+
+    asyncio.run(handle_concurrently())
+    asyncio.run(handle_concurrently())
+
+    assert max_running == 1
+
+
+def test_events_fired_by_limited_handlers():
+    events = AsyncManager(concurrency=1)
+
+    async def handler(e):
+        await events.handle(e.effects)
+
+    async def nested_handler(effects):
+        effects.append("nested")
+
+    events.subscribe(handler, Event)
+    events.subscribe(nested_handler, list)
+
+    e = Event()
+    asyncio.run(asyncio.wait_for(events.handle(e), 1))
+
+    assert e.effects == ["nested"]
+
+
+def test_invalid_concurrency_limit():
+    with pytest.raises(ValueError):
+        AsyncManager(concurrency=0)
+
+
+def test_sync_handlers_in_executor():
+    events = AsyncManager(sync_in_executor=True)
+    threads = []
+    events.subscribe(lambda e: threads.append(threading.current_thread()), Event)
+
+    asyncio.run(events.handle(Event()))
+
+    assert threads
+    assert threads[0] is not threading.current_thread()
+
+
+def test_weak_coroutine_handler_in_executor_mode():
+    events = AsyncManager(sync_in_executor=True)
+
+    class Listener:
+        async def on_event(self, e):
+            await asyncio.sleep(0)
+            e.effects.append(threading.current_thread())
+
+    listener = Listener()
+    events.subscribe(listener.on_event, Event, weak=True)
+
+    e = Event()
+    asyncio.run(events.handle(e))
+
+    assert e.effects == [threading.current_thread()]
+
+
+def test_collect_all_exceptions():
+    events = AsyncManager()
+
+    async def async_handler(e):
+        raise ValueError("async")
+
+    def sync_handler(e):
+        raise ValueError("sync")
+
+    events.subscribe(async_handler, Event)
+    events.subscribe(sync_handler, Event)
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        asyncio.run(events.handle(Event()))
+
+    assert sorted(str(e) for e in excinfo.value.exceptions) == ["async", "sync"]
+
+
+def test_fail_fast():
+    events = AsyncManager(errors="fail_fast")
+
+    async def failing_handler(e):
+        raise ValueError("async")
+
+    def later_handler(e):
+        e.effects.append("later")
+
+    events.subscribe(failing_handler, EventA)
+    events.subscribe(later_handler, Event)
+
+    e = EventA()
+    with pytest.raises(ValueError):
+        asyncio.run(events.handle(e))
+    assert e.effects == []
+
+
+def test_collect_across_groups():
+    events = AsyncManager(errors="collect")
+
+    async def async_handler(e):
+        raise ValueError("async")
+
+    def sync_handler(e):
+        raise ValueError("sync")
+
+    events.subscribe(async_handler, Event)
+    events.subscribe(sync_handler, EventA)
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        asyncio.run(events.handle(EventA()))
+    assert [str(e) for e in excinfo.value.exceptions] == ["sync", "async"]
+
+
+def test_error_callback():
+    failures = []
+    events = AsyncManager(errors=lambda h, e, exc: failures.append((h, exc)))
+
+    async def failing_handler(e):
+        raise ValueError("async")
+
+    events.subscribe(failing_handler, Event)
+    asyncio.run(events.handle(Event()))
+
+    assert [(h, str(exc)) for h, exc in failures] == [(failing_handler, "async")]
+
+
+def test_handle_many():
+    events = AsyncManager()
+    batches: list[object] = []
+
+    async def handler(e):
+        await asyncio.sleep(0)
+        e.effects.append("handled")
+
+    events.subscribe(handler, Event)
+    events.subscribe(batches.append, Event, batch=True)
+
+    handled = [Event(), EventA()]
+    asyncio.run(events.handle_many(handled))
+
+    assert [e.effects for e in handled] == [["handled"], ["handled"]]
+    assert batches == [handled]
+
+
+def test_iter_handle():
+    events = AsyncManager()
+
+    async def async_handler(e):
+        await asyncio.sleep(0)
+        return "async"
+
+    def sync_handler(e):
+        return "sync"
+
+    events.subscribe(async_handler, Event)
+    events.subscribe(sync_handler, EventA)
+
+    async def collect():
+        return [item async for item in events.iter_handle(EventA())]
+
+    assert asyncio.run(collect()) == [
+        (sync_handler, "sync"),
+        (async_handler, "async"),
+    ]
+
+
+def test_monitor_and_trace():
+    events = AsyncManager()
+    events.monitor = HandlerMonitor()
+    events.trace = EventTrace()
+
+    async def async_handler(e):
+        await asyncio.sleep(0.01)
+
+    def sync_handler(e):
+        pass
+
+    events.subscribe(async_handler, Event)
+    events.subscribe(sync_handler, Event)
+    asyncio.run(events.handle(Event()))
+
+    stats = {s.handler: s for s in events.monitor.snapshot()}
+    assert stats[async_handler].calls == 1
+    assert stats[async_handler].total_time >= 0.01
+    assert stats[sync_handler].calls == 1
+    [entry] = events.trace.entries()
+    assert entry.event_type is Event
+    assert entry.handler_count == 2
+
+
+def test_deduplicate():
+    events = AsyncManager(deduplicate=True)
+    calls = []
+
+    async def handler(e):
+        calls.append(e)
+
+    events.subscribe(handler, Event)
+    events.subscribe(handler, EventA)
+    asyncio.run(events.handle(EventA()))
+
+    assert len(calls) == 1
+
+
+def test_no_queued_delivery():
+    events = AsyncManager()
+
+    assert not isinstance(events, Manager)
+    assert not hasattr(events, "post")
+    assert not hasattr(events, "start_worker")
+    assert not hasattr(events, "coalesce")
@@ -0,0 +1,169 @@
+"""Tests for event coalescing in :class:`generic.event.Manager`."""
+
+from __future__ import annotations
+
+import threading
+from sys import version_info
+
+import pytest
+
+if version_info < (3, 11):
+    from exceptiongroup import ExceptionGroup
+
+from generic.event import Manager
+
+
+class Changed:
+    def __init__(self, element: str, value: int) -> None:
+        self.element = element
+        self.value = value
+
+
+class AttributeChanged(Changed):
+    pass
+
+
+class Other:
+    pass
+
+
+@pytest.fixture
+def events():
+    return Manager()
+
+
+@pytest.fixture
+def delivered(events):
+    delivered: list[object] = []
+
+    def handler(e):
+        delivered.append(e)
+
+    events.subscribe(handler, object)
+    return delivered
+
+
+def test_batch_coalesces_on_key(events, delivered):
+    events.coalesce(Changed, key=lambda e: e.element)
+
+    with events.batch():
+        events.handle(Changed("a", 1))
+        events.handle(Changed("b", 1))
+        events.handle(AttributeChanged("a", 2))
+        assert delivered == []
+
+    assert [(e.element, e.value) for e in delivered] == [("a", 2), ("b", 1)]
+
+
+def test_batch_delivers_only_latest_without_key(events, delivered):
+    events.coalesce(Changed)
+
+    with events.batch():
+        for i in range(10):
+            events.handle(Changed("a", i))
+
+    assert [e.value for e in delivered] == [9]
+
+
+def test_batch_does_not_hold_back_other_events(events, delivered):
+    events.coalesce(Changed)
+    other = Other()
+
+    with events.batch():
+        events.handle(Changed("a", 1))
+        events.handle(other)
+        assert delivered == [other]
+
+    assert len(delivered) == 2
+
+
+def test_nested_batches(events, delivered):
+    events.coalesce(Changed)
+
+    with events.batch():
+        with events.batch():
+            events.handle(Changed("a", 1))
+        assert delivered == []
+        events.handle(Changed("a", 2))
+
+    assert [e.value for e in delivered] == [2]
+
+
+def test_batch_only_holds_back_own_thread(events, delivered):
+    events.coalesce(Changed)
+    changed = Changed("a", 1)
+
+    with events.batch():
+        thread = threading.Thread(target=events.handle, args=(changed,))
+        thread.start()
+        thread.join()
+        assert delivered == [changed]
+        events.handle(Changed("a", 2))
+        assert delivered == [changed]
+
+    assert [e.value for e in delivered] == [1, 2]
+
+
+def test_no_coalescing_outside_batch(events, delivered):
+    events.coalesce(Changed)
+
+    events.handle(Changed("a", 1))
+    events.handle(Changed("a", 2))
+
+    assert [e.value for e in delivered] == [1, 2]
+
+
+def test_batch_collects_exceptions(events):
+    def handler(e):
+        raise ValueError(e.element)
+
+    events.subscribe(handler, Changed)
+    events.coalesce(Changed, key=lambda e: e.element)
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        with events.batch():
+            events.handle(Changed("a", 1))
+            events.handle(Changed("b", 1))
+
+    assert len(excinfo.value.exceptions) == 2
+
+
+def test_debounce(events):
+    delivered = []
+    done = threading.Event()
+
+    def handler(e):
+        delivered.append(e.value)
+        done.set()
+
+    events.subscribe(handler, Changed)
+    events.coalesce(Changed, delay=0.05)
+
+    for i in range(5):
+        events.handle(Changed("a", i))
+    assert delivered == []
+
+    assert done.wait(timeout=5)
+    assert delivered == [4]
+
+
+def test_debounce_keys_share_one_thread(events):
+    delivered = []
+    done = threading.Event()
+
+    def handler(e):
+        delivered.append((e.element, e.value))
+        if len(delivered) == 2:
+            done.set()
+
+    events.subscribe(handler, Changed)
+    events.coalesce(Changed, key=lambda e: e.element, delay=0.05)
+    threads = threading.active_count()
+
+    for i in range(100):
+        events.handle(Changed("a", i))
+        events.handle(Changed("b", i))
+    assert threading.active_count() <= threads + 1
+
+    assert done.wait(timeout=5)
+    assert sorted(delivered) == [("a", 99), ("b", 99)]
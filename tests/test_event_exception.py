@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from sys import version_info
 from typing import Callable
 
@@ -50,6 +51,90 @@ def test_collect_all_exceptions(events):
     assert "handler2" in nested_exc
 
 
+def test_raise_after_handlers_of_same_priority(events):
+    events.subscribe(make_handler("handler1"), MyEvent, priority=1)
+    events.subscribe(make_handler("handler2"), MyEvent, priority=1)
+    events.subscribe(make_handler("handler3"), MyEvent)
+    e = MyEvent()
+    with pytest.raises(ExceptionGroup) as excinfo:
+        events.handle(e)
+
+    assert e.effects == ["handler1", "handler2"]
+    assert len(excinfo.value.exceptions) == 2
+
+
+def test_collect_exceptions_from_parallel_handlers():
+    with ThreadPoolExecutor() as executor:
+        events = Manager(executor=executor)
+        events.subscribe(make_handler("handler1"), MyEvent, parallel=True)
+        events.subscribe(make_handler("handler2"), MyEvent)
+        e = MyEvent()
+        with pytest.raises(ExceptionGroup) as excinfo:
+            events.handle(e)
+
+    nested_exc = [str(e) for e in excinfo.value.exceptions]
+    assert sorted(nested_exc) == ["handler1", "handler2"]
+
+
+def test_group_policy_skips_less_specific_handlers(events):
+    events.subscribe(make_handler("handler1"), MyEvent)
+    events.subscribe(make_handler("handler2"), object)
+    e = MyEvent()
+    with pytest.raises(ExceptionGroup):
+        events.handle(e)
+
+    assert e.effects == ["handler1"]
+
+
+def test_collect_policy_runs_all_handlers():
+    events = Manager(errors="collect")
+    events.subscribe(make_handler("handler1"), MyEvent)
+    events.subscribe(make_handler("handler2"), object)
+    e = MyEvent()
+    with pytest.raises(ExceptionGroup) as excinfo:
+        events.handle(e)
+
+    assert e.effects == ["handler1", "handler2"]
+    assert len(excinfo.value.exceptions) == 2
+
+
+def test_fail_fast_policy():
+    events = Manager(errors="fail_fast")
+    events.subscribe(make_handler("handler1"), MyEvent)
+    events.subscribe(make_handler("handler2"), MyEvent)
+    e = MyEvent()
+    with pytest.raises(ValueError, match="handler1"):
+        events.handle(e)
+
+    assert e.effects == ["handler1"]
+
+
+def test_fail_fast_policy_with_parallel_handlers():
+    with ThreadPoolExecutor() as executor:
+        events = Manager(errors="fail_fast", executor=executor)
+        events.subscribe(make_handler("handler1"), MyEvent, parallel=True)
+        e = MyEvent()
+        with pytest.raises(ValueError, match="handler1"):
+            events.handle(e)
+
+
+def test_error_callback_policy():
+    errors = []
+    events = Manager(errors=lambda h, e, exc: errors.append(str(exc)))
+    events.subscribe(make_handler("handler1"), MyEvent)
+    events.subscribe(make_handler("handler2"), object)
+    e = MyEvent()
+    events.handle(e)
+
+    assert e.effects == ["handler1", "handler2"]
+    assert errors == ["handler1", "handler2"]
+
+
+def test_unknown_error_policy():
+    with pytest.raises(ValueError):
+        Manager(errors="ignore")  # type: ignore[arg-type]
+
+
 class MyEvent:
     def __init__(self) -> None:
         self.effects: list[object] = []
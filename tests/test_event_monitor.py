@@ -0,0 +1,114 @@
+"""Tests for :class:`generic.event.HandlerMonitor`."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from sys import version_info
+
+import pytest
+
+if version_info < (3, 11):
+    from exceptiongroup import ExceptionGroup
+
+from generic.event import HandlerMonitor, Manager
+
+
+class MyEvent:
+    pass
+
+
+def fast_handler(e):
+    pass
+
+
+def slow_handler(e):
+    time.sleep(0.01)
+
+
+def failing_handler(e):
+    raise ValueError()
+
+
+@pytest.fixture
+def events():
+    events = Manager()
+    events.subscribe(fast_handler, MyEvent)
+    events.subscribe(slow_handler, MyEvent)
+    return events
+
+
+def test_collect_statistics(events):
+    monitor = HandlerMonitor()
+    events.monitor = monitor
+
+    events.handle(MyEvent())
+    events.handle(MyEvent())
+
+    snapshot = monitor.snapshot()
+    assert [s.handler for s in snapshot] == [slow_handler, fast_handler]
+    assert snapshot[0].calls == 2
+    assert snapshot[0].total_time >= 0.02
+    assert snapshot[0].max_time >= 0.01
+    assert snapshot[0].exceptions == 0
+    assert monitor.handler_calls() == {MyEvent: 4}
+
+
+def test_record_exceptions(events):
+    monitor = HandlerMonitor()
+    events.monitor = monitor
+    events.subscribe(failing_handler, MyEvent)
+
+    with pytest.raises(ExceptionGroup):
+        events.handle(MyEvent())
+
+    stats = {s.handler: s for s in monitor.snapshot()}
+    assert stats[failing_handler].exceptions == 1
+    assert stats[fast_handler].exceptions == 0
+
+
+def test_slow_handler_callback(events):
+    slow = []
+    events.monitor = HandlerMonitor(
+        slow_threshold=0.005, on_slow=lambda h, e, t: slow.append(h)
+    )
+
+    events.handle(MyEvent())
+
+    assert slow == [slow_handler]
+
+
+@pytest.mark.parametrize("errors", ["group", "fail_fast"])
+def test_parallel_handlers_in_process_pool(errors):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        events = Manager(executor=executor, errors=errors)
+        events.monitor = HandlerMonitor()
+        events.subscribe(slow_handler, MyEvent, parallel=True)
+        events.subscribe(fast_handler, MyEvent, parallel=True)
+
+        events.handle(MyEvent())
+
+    stats = {s.handler: s for s in events.monitor.snapshot()}
+    assert stats[slow_handler].calls == 1
+    assert stats[slow_handler].total_time >= 0.01
+    assert stats[fast_handler].calls == 1
+
+
+def test_disable_monitor(events):
+    monitor = HandlerMonitor()
+    events.monitor = monitor
+    events.handle(MyEvent())
+    events.monitor = None
+    events.handle(MyEvent())
+
+    assert all(s.calls == 1 for s in monitor.snapshot())
+
+
+def test_reset(events):
+    monitor = HandlerMonitor()
+    events.monitor = monitor
+    events.handle(MyEvent())
+    monitor.reset()
+
+    assert monitor.snapshot() == []
+    assert monitor.handler_calls() == {}
@@ -0,0 +1,199 @@
+"""Tests for queued event delivery with :meth:`generic.event.Manager.post`."""
+
+from __future__ import annotations
+
+import threading
+from queue import Full
+from sys import version_info
+
+import pytest
+
+if version_info < (3, 11):
+    from exceptiongroup import ExceptionGroup
+
+from generic.event import Manager
+
+
+class Event:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def test_post_delivers_event():
+    events = Manager()
+    delivered = []
+
+    def handler(e):
+        delivered.append(e.name)
+
+    events.subscribe(handler, Event)
+
+    events.post(Event("a"))
+
+    assert delivered == ["a"]
+
+
+def test_post_from_handler_is_not_recursive():
+    events = Manager()
+    delivered = []
+
+    def handler(e):
+        delivered.append(f"start {e.name}")
+        if e.name == "a":
+            events.post(Event("b"))
+            events.post(Event("c"))
+        delivered.append(f"end {e.name}")
+
+    events.subscribe(handler, Event)
+    events.post(Event("a"))
+
+    assert delivered == ["start a", "end a", "start b", "end b", "start c", "end c"]
+
+
+def test_deep_posting_does_not_exhaust_stack():
+    events = Manager()
+    count = 0
+
+    def handler(e):
+        nonlocal count
+        count += 1
+        if count < 10000:
+            events.post(e)
+
+    events.subscribe(handler, Event)
+    events.post(Event("a"))
+
+    assert count == 10000
+
+
+def test_overflow_drop_oldest():
+    events = Manager(max_queue_size=2, overflow="drop_oldest")
+    delivered = []
+
+    def handler(e):
+        delivered.append(e.name)
+        if e.name == "a":
+            for name in "bcd":
+                events.post(Event(name))
+
+    events.subscribe(handler, Event)
+    events.post(Event("a"))
+
+    assert delivered == ["a", "c", "d"]
+
+
+def test_overflow_raise():
+    events = Manager(max_queue_size=1, overflow="raise")
+
+    def handler(e):
+        if e.name == "a":
+            events.post(Event("b"))
+            events.post(Event("c"))
+
+    events.subscribe(handler, Event)
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        events.post(Event("a"))
+
+    assert isinstance(excinfo.value.exceptions[0], Full)
+
+
+def test_overflow_block_does_not_deadlock_draining_thread():
+    events = Manager(max_queue_size=1, overflow="block")
+
+    def handler(e):
+        if e.name == "a":
+            events.post(Event("b"))
+            events.post(Event("c"))
+
+    events.subscribe(handler, Event)
+
+    with pytest.raises(ExceptionGroup) as excinfo:
+        events.post(Event("a"))
+
+    assert isinstance(excinfo.value.exceptions[0], Full)
+
+
+def test_drain_continues_after_handler_error():
+    events = Manager(max_queue_size=2, overflow="block")
+    delivered = []
+
+    def handler(e):
+        delivered.append(e.name)
+        if e.name == "a":
+            events.post(Event("b"))
+            events.post(Event("c"))
+            raise ValueError()
+
+    events.subscribe(handler, Event)
+
+    with pytest.raises(ExceptionGroup):
+        events.post(Event("a"))
+    assert delivered == ["a", "b", "c"]
+
+    events.post(Event("d"))
+    assert delivered == ["a", "b", "c", "d"]
+
+
+def test_post_drains_full_queue_left_behind():
+    events = Manager(max_queue_size=1, overflow="block")
+    delivered = []
+
+    def handler(e):
+        delivered.append(e.name)
+
+    events.subscribe(handler, Event)
+    # Left behind by a drain interrupted by a KeyboardInterrupt, say
+    events._queue.append(Event("left"))
+
+    events.post(Event("a"))
+
+    assert delivered == ["left", "a"]
+
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        Manager(overflow="ignore")  # type: ignore[arg-type]
+
+
+def test_worker_thread():
+    events = Manager(max_queue_size=1, overflow="block")
+    delivered = []
+    threads = set()
+
+    def handler(e):
+        threads.add(threading.current_thread())
+        delivered.append(e.name)
+
+    events.subscribe(handler, Event)
+    events.start_worker()
+    for name in "abcde":
+        events.post(Event(name))
+    events.stop_worker()
+
+    assert delivered == list("abcde")
+    assert threading.current_thread() not in threads
+
+
+def test_worker_logs_exceptions(caplog):
+    events = Manager()
+
+    def handler(e):
+        raise ValueError(e.name)
+
+    events.subscribe(handler, Event)
+    events.start_worker()
+    events.post(Event("a"))
+    events.stop_worker()
+
+    assert "Error while handling event" in caplog.text
+
+
+def test_worker_can_only_be_started_once():
+    events = Manager()
+    events.start_worker()
+    try:
+        with pytest.raises(RuntimeError):
+            events.start_worker()
+    finally:
+        events.stop_worker()
@@ -0,0 +1,135 @@
+"""Tests for :class:`generic.event.EventTrace`."""
+
+from __future__ import annotations
+
+import io
+import json
+from sys import version_info
+
+import pytest
+
+if version_info < (3, 11):
+    from exceptiongroup import ExceptionGroup
+
+from generic.event import EventTrace, Manager
+
+
+class EventA:
+    pass
+
+
+class EventB(EventA):
+    pass
+
+
+def handler(e):
+    pass
+
+
+def failing_handler(e):
+    raise ValueError()
+
+
+@pytest.fixture
+def events():
+    events = Manager()
+    events.subscribe(handler, EventA)
+    events.subscribe(lambda e: None, EventB)
+    return events
+
+
+def test_record_events(events):
+    trace = EventTrace()
+    events.trace = trace
+
+    events.handle(EventA())
+    events.handle(EventB())
+
+    entries = trace.entries()
+    assert len(trace) == 2
+    assert [e.event_type for e in entries] == [EventA, EventB]
+    assert [e.handler_count for e in entries] == [1, 2]
+    assert entries[0].timestamp <= entries[1].timestamp
+    assert all(e.duration >= 0 for e in entries)
+
+
+def test_record_failing_events(events):
+    trace = EventTrace()
+    events.trace = trace
+    events.subscribe(failing_handler, EventA)
+
+    with pytest.raises(ExceptionGroup):
+        events.handle(EventA())
+
+    assert len(trace) == 1
+
+
+def test_record_events_handled_in_bulk(events):
+    trace = EventTrace()
+    events.trace = trace
+
+    events.handle_many([EventA(), EventB()])
+
+    assert [e.event_type for e in trace.entries()] == [EventA, EventB]
+
+
+def test_ring_buffer_overwrites_oldest_entries(events):
+    trace = EventTrace(size=3)
+    events.trace = trace
+
+    for event_type in (EventA, EventA, EventB, EventB):
+        events.handle(event_type())
+
+    assert [e.event_type for e in trace.entries()] == [EventA, EventB, EventB]
+
+
+def test_clear(events):
+    trace = EventTrace()
+    events.trace = trace
+    events.handle(EventA())
+
+    trace.clear()
+
+    assert trace.entries() == []
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        EventTrace(size=0)
+
+
+def test_dump_and_load(events):
+    trace = EventTrace(size=2)
+    events.trace = trace
+    for event_type in (EventA, EventB, EventA):
+        events.handle(event_type())
+
+    file = io.BytesIO()
+    trace.dump(file)
+    file.seek(0)
+    entries = EventTrace.load(file)
+
+    assert [e.event_type for e in entries] == [
+        f"{__name__}:EventB",
+        f"{__name__}:EventA",
+    ]
+    assert [e.handler_count for e in entries] == [2, 1]
+    assert [e.timestamp for e in entries] == [e.timestamp for e in trace.entries()]
+
+
+def test_load_invalid_file():
+    with pytest.raises(ValueError):
+        EventTrace.load(io.BytesIO(b"\0" * 12))
+
+
+def test_dump_json(events):
+    trace = EventTrace()
+    events.trace = trace
+    events.handle(EventA())
+
+    file = io.StringIO()
+    trace.dump_json(file)
+    data = json.loads(file.getvalue())
+
+    assert data[0]["event_type"] == f"{__name__}:EventA"
+    assert data[0]["handler_count"] == 1
@@ -0,0 +1,194 @@
+"""Tests for :class:`generic.eventbus.EventBridge`."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from multiprocessing import Pipe
+from multiprocessing.connection import Client, Listener
+
+import pytest
+
+from generic.event import Manager
+from generic.eventbus import EventBridge
+
+
+class Event:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class Other:
+    pass
+
+
+def collect(manager, event_type=Event):
+    received: list[str] = []
+
+    def handler(e):
+        received.append(e.name)
+
+    manager.subscribe(handler, event_type)
+    return received
+
+
+@pytest.fixture
+def managers():
+    return Manager(), Manager()
+
+
+@pytest.fixture
+def bridges(managers):
+    local, remote = managers
+    conn1, conn2 = Pipe()
+    with EventBridge(local, conn1, [Event], batch_size=2) as bridge1:
+        with EventBridge(remote, conn2, [Event], batch_size=2) as bridge2:
+            yield bridge1, bridge2
+
+
+def test_forward_events_in_batches(managers, bridges):
+    local, remote = managers
+    bridge1, bridge2 = bridges
+    received = collect(remote)
+
+    local.handle(Event("a"))
+    assert bridge2.receive() == 0
+
+    local.handle(Event("b"))
+    local.handle(Other())
+    local.handle(Event("c"))
+    assert bridge2.receive() == 2
+    assert received == ["a", "b"]
+
+    bridge1.flush()
+    assert bridge2.receive() == 1
+    assert received == ["a", "b", "c"]
+
+
+def test_received_events_are_not_sent_back(managers, bridges):
+    local, remote = managers
+    bridge1, bridge2 = bridges
+    received = collect(local)
+
+    local.handle(Event("a"))
+    bridge1.flush()
+    bridge2.receive()
+    bridge2.flush()
+
+    assert bridge1.receive() == 0
+    assert received == ["a"]
+
+
+def test_events_fired_by_handlers_of_received_events_are_sent(managers, bridges):
+    local, remote = managers
+    bridge1, bridge2 = bridges
+    received = collect(local)
+
+    def react(e):
+        if not e.name.endswith("!"):
+            remote.handle(Event(e.name + "!"))
+
+    remote.subscribe(react, Event)
+
+    local.handle(Event("a"))
+    bridge1.flush()
+    bridge2.receive()
+    bridge2.flush()
+
+    assert bridge1.receive() == 1
+    assert received == ["a", "a!"]
+
+
+def test_close_sends_pending_events(managers):
+    local, remote = managers
+    conn1, conn2 = Pipe()
+    received = collect(remote)
+    bridge1 = EventBridge(local, conn1, [Event])
+    bridge2 = EventBridge(remote, conn2)
+
+    local.handle(Event("a"))
+    bridge1.close()
+    bridge2.receive()
+
+    assert received == ["a"]
+    local.handle(Event("b"))
+    assert bridge2.receive() == 0
+
+
+def test_flush_interval(managers):
+    local, remote = managers
+    conn1, conn2 = Pipe()
+    received = collect(remote)
+
+    with EventBridge(local, conn1, [Event], flush_interval=0.01):
+        bridge = EventBridge(remote, conn2)
+        local.handle(Event("a"))
+
+        assert bridge.receive(timeout=5) == 1
+        assert received == ["a"]
+
+
+def test_receiver_thread(managers):
+    local, remote = managers
+    conn1, conn2 = Pipe()
+    done = threading.Event()
+
+    def handler(e):
+        done.set()
+
+    remote.subscribe(handler, Event)
+    bridge = EventBridge(remote, conn2)
+    bridge.start()
+
+    with EventBridge(local, conn1, [Event]):
+        local.handle(Event("a"))
+
+    assert done.wait(timeout=5)
+    with pytest.raises(RuntimeError):
+        bridge.start()
+
+
+class JsonSerializer:
+    def dumps(self, events):
+        return json.dumps([e.name for e in events]).encode()
+
+    def loads(self, data):
+        return [Event(name) for name in json.loads(data)]
+
+
+def test_custom_serializer(managers):
+    local, remote = managers
+    conn1, conn2 = Pipe()
+    received = collect(remote)
+
+    serializer = JsonSerializer()
+    with EventBridge(local, conn1, [Event], serializer=serializer):
+        local.handle(Event("a"))
+    EventBridge(remote, conn2, serializer=serializer).receive()
+
+    assert received == ["a"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets only")
+def test_unix_socket(managers, tmp_path):
+    local, remote = managers
+    received = collect(remote)
+    address = str(tmp_path / "events.sock")
+
+    with Listener(address, family="AF_UNIX") as listener:
+        client = Client(address, family="AF_UNIX")
+        server = listener.accept()
+
+    with EventBridge(local, client, [Event]):
+        local.handle(Event("a"))
+    EventBridge(remote, server).receive(timeout=5)
+
+    assert received == ["a"]
+
+
+def test_invalid_batch_size(managers):
+    conn1, conn2 = Pipe()
+
+    with pytest.raises(ValueError):
+        EventBridge(managers[0], conn1, batch_size=0)
@@ -0,0 +1,163 @@
+"""Tests for registering classes by name, as ``"module:qualname"``, before
+their module is imported."""
+
+from __future__ import annotations
+
+import io
+import sys
+import textwrap
+from typing import Any
+
+import pytest
+
+from generic.event import Manager
+from generic.multidispatch import multidispatch
+from generic.registry import Registry, SimpleAxis, SubclassAxis, TypeAxis
+
+SHAPES = """
+class Shape:
+    pass
+
+class Circle(Shape):
+    class Center:
+        pass
+"""
+
+
+@pytest.fixture
+def shapes(tmp_path, monkeypatch):
+    (tmp_path / "lazy_shapes.py").write_text(textwrap.dedent(SHAPES))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    sys.modules.pop("lazy_shapes", None)
+
+
+def test_register_before_import(shapes):
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("shape", "lazy_shapes:Shape")
+    registry.register("center", "lazy_shapes:Circle.Center")
+
+    assert registry.lookup(object()) is None
+    assert "lazy_shapes" not in sys.modules
+    assert registry.get_registration("lazy_shapes:Shape") == "shape"
+
+    import lazy_shapes
+
+    assert registry.lookup(lazy_shapes.Circle()) == "shape"
+    assert registry.lookup(lazy_shapes.Circle.Center()) == "center"
+    assert registry.get_registration(lazy_shapes.Shape) == "shape"
+
+
+def test_register_after_import(shapes):
+    import lazy_shapes
+
+    registry: Registry[str] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+    registry.register("shape", "lazy_shapes:Shape", "a:b")
+
+    assert registry.get_registration(lazy_shapes.Shape, "a:b") == "shape"
+    assert registry.lookup(lazy_shapes.Shape(), "a:b") == "shape"
+
+
+def test_unregister_pending_registration(shapes):
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("shape", "lazy_shapes:Shape")
+
+    assert registry.unregister("lazy_shapes:Shape") == "shape"
+    assert registry.unregister("lazy_shapes:Shape") is None
+
+    import lazy_shapes
+
+    assert registry.lookup(lazy_shapes.Shape()) is None
+
+
+def test_pending_registration_in_overlay(shapes):
+    registry: Registry[str] = Registry(("type", SubclassAxis()))
+    overlay = registry.overlay()
+    overlay.register("shape", "lazy_shapes:Shape")
+
+    import lazy_shapes
+
+    assert overlay.lookup(lazy_shapes.Circle) == "shape"
+    assert registry.lookup(lazy_shapes.Circle) is None
+
+
+def test_dump_pending_registration(shapes):
+    registry: Registry[Any] = Registry(("type", TypeAxis()))
+    registry.register(textwrap.dedent, "lazy_shapes:Shape")
+    file = io.StringIO()
+    registry.dump(file)
+    file.seek(0)
+
+    restored: Registry[Any] = Registry(("type", TypeAxis()))
+    assert restored.load(file)
+    assert restored.get_registration("lazy_shapes:Shape")
+
+
+def test_invalid_class_name():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+
+    with pytest.raises(ValueError):
+        registry.register("shape", "lazy_shapes")
+
+
+def test_multidispatch_on_class_names(shapes):
+    @multidispatch(object)
+    def describe(obj):
+        return "object"
+
+    @describe.register("lazy_shapes:Circle")
+    def describe_circle(obj):
+        return "circle"
+
+    assert describe(1) == "object"
+
+    import lazy_shapes
+
+    assert describe(lazy_shapes.Circle()) == "circle"
+    assert describe(lazy_shapes.Shape()) == "object"
+
+
+def test_subscribe_by_name(shapes):
+    events = Manager()
+    received: list[object] = []
+    events.subscribe(received.append, object)
+    events.subscribe(lambda e: received.append("shape"), "lazy_shapes:Shape")
+    events.handle("event")
+
+    import lazy_shapes
+
+    circle = lazy_shapes.Circle()
+    events.handle(circle)
+
+    assert received == ["event", "shape", circle]
+
+
+def test_unsubscribe_by_name(shapes):
+    events = Manager()
+    received: list[object] = []
+    events.subscribe(received.append, "lazy_shapes:Shape")
+    events.unsubscribe(received.append, "lazy_shapes:Shape")
+
+    import lazy_shapes
+
+    events.handle(lazy_shapes.Shape())
+    events.subscribe(received.append, "lazy_shapes:Shape")
+    events.handle(lazy_shapes.Shape())
+    events.unsubscribe(received.append, "lazy_shapes:Shape")
+    events.handle(lazy_shapes.Shape())
+
+    assert len(received) == 1
+
+
+def test_class_missing_from_imported_module(shapes, caplog):
+    import lazy_shapes  # noqa: F401
+
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("square", "lazy_shapes:Square")
+    registry.register("shape", "lazy_shapes:Shape")
+
+    assert registry.lookup(lazy_shapes.Circle()) == "shape"
+    assert "lazy_shapes:Square" in caplog.text
+    # The dropped name doesn't force a rescan on every lookup
+    assert not registry._deferred._items
+    assert registry._deferred._modules == len(sys.modules)
@@ -1,11 +1,14 @@
 """Tests for :module:`generic.multidispatch`."""
 
+import io
+import json
 import logging
 from inspect import FullArgSpec
 
 import pytest
 
 from generic.multidispatch import FunctionDispatcher, multidispatch
+from generic.registry import AmbiguousLookupError
 
 
 def create_dispatcher(
@@ -259,3 +262,158 @@ def test_logging(caplog):
     assert rec.levelname == "DEBUG"
     assert rec.module == "multidispatch"
     assert rec.name == "generic.multidispatch"
+
+
+class Model:
+    pass
+
+
+class Element(Model):
+    pass
+
+
+def test_dispatch_on_classes():
+    @multidispatch(type[Model])
+    def factory(cls):
+        return "model"
+
+    @factory.register(type[Element])
+    def element_factory(cls):
+        return "element"
+
+    assert factory(Model) == "model"
+    assert factory(Element) == "element"
+    with pytest.raises(TypeError):
+        factory(Element())
+
+
+def test_dispatch_on_classes_and_instances():
+    @multidispatch(type[Model], object)
+    def convert(cls, value):
+        return "model"
+
+    @convert.register(type[Element], str)
+    def convert_element_str(cls, value):
+        return "element str"
+
+    assert convert(Element, "x") == "element str"
+    assert convert(Element, 1) == "model"
+    assert convert(Model, "x") == "model"
+
+
+def test_register_class_rule_without_type_parameter():
+    @multidispatch(type[Model])
+    def factory(cls):
+        return "model"
+
+    with pytest.raises(TypeError):
+        factory.register(Element)(lambda cls: "element")
+
+    @multidispatch(Model)
+    def describe(obj):
+        return "model"
+
+    with pytest.raises(TypeError):
+        describe.register(type[Element])(lambda obj: "element")
+
+
+def test_symmetric_dispatch():
+    @multidispatch(Model, Model, symmetric=True)
+    def combine(a, b):
+        return "model model"
+
+    @combine.register(Element, Model)
+    def combine_element_model(a, b):
+        return "element model"
+
+    @combine.register(Model, Element)
+    def combine_model_element(a, b):
+        return "model element"
+
+    assert combine(Element(), Model()) == "element model"
+    assert combine(Model(), Model()) == "model model"
+    with pytest.raises(AmbiguousLookupError):
+        combine(Element(), Element())
+
+
+def test_rules_are_cached_until_registry_changes():
+    @multidispatch(Model)
+    def describe(obj):
+        return "model"
+
+    assert describe(Element()) == "model"
+    assert describe._rules == {(Element,): describe.registry.lookup(Model())}
+
+    @describe.register(Element)
+    def describe_element(obj):
+        return "element"
+
+    assert describe(Element()) == "element"
+
+
+def test_overlay_bypasses_cached_rules():
+    @multidispatch(Model)
+    def describe(obj):
+        return "model"
+
+    describe(Element())
+    overlay = describe.registry.overlay()
+    overlay.register(lambda obj: "overlay", Element)
+
+    with overlay.activate():
+        assert describe(Element()) == "overlay"
+    assert describe(Element()) == "model"
+
+
+def test_overlay_rules_cached():
+    @multidispatch(Model)
+    def describe(obj):
+        return "model"
+
+    overlay = describe.registry.overlay()
+    overlay.register(lambda obj: "overlay", Element)
+
+    with overlay.activate():
+        assert describe(Element()) == "overlay"
+        assert describe(Model()) == "model"
+        assert set(describe._overlay_rules[overlay][1]) == {(Element,), (Model,)}
+
+        # Changing any layer drops the rules cached for the overlay
+        describe.registry.unregister(Model)
+        describe.register(Model)(lambda obj: "new model")
+        assert describe(Model()) == "new model"
+        overlay.unregister(Element)
+        overlay.register(lambda obj: "new overlay", Element)
+        assert describe(Element()) == "new overlay"
+    assert describe._rules == {}
+
+
+def test_warm_up_rules():
+    @multidispatch(Model, type[Model])
+    def describe(obj, cls):
+        return "model"
+
+    describe(Element(), Element)
+    describe(Model(), Model)
+    file = io.StringIO()
+    describe.dump_argtypes(file)
+    file.seek(0)
+
+    @multidispatch(Model, type[Model])
+    def describe_again(obj, cls):
+        return "model"
+
+    assert describe_again.warm_up(file) == 2
+    assert set(describe_again._rules) == {(Element, Element), (Model, Model)}
+
+
+def test_warm_up_skips_unknown_types():
+    @multidispatch(object)
+    def describe(obj):
+        return "object"
+
+    file = io.StringIO(
+        json.dumps({"argtypes": [["builtins:int"], ["no_such_module:Type"]]})
+    )
+
+    assert describe.warm_up(file, background=True) == 1
@@ -0,0 +1,154 @@
+"""Tests for :class:`generic.multidispatch.DispatchProfile`."""
+
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from generic.multidispatch import DispatchProfile, multidispatch
+from generic.multimethod import has_multimethods, multimethod
+
+
+class Shape:
+    pass
+
+
+class Circle(Shape):
+    pass
+
+
+class Square(Shape):
+    pass
+
+
+@pytest.fixture
+def area():
+    @multidispatch(Shape)
+    def area(shape):
+        return 0
+
+    @area.register(Circle)
+    def circle_area(shape):
+        time.sleep(0.01)
+        return 3
+
+    @area.register(Square)
+    def square_area(shape):
+        return 4
+
+    return area
+
+
+def test_profile_rules(area):
+    profile = DispatchProfile()
+    area.profile = profile
+
+    assert area(Circle()) == 3
+    area(Circle())
+    area(Shape())
+
+    snapshot = profile.snapshot()
+    assert [s.rule.__name__ for s in snapshot] == ["circle_area", "area"]
+    assert snapshot[0].calls == 2
+    assert snapshot[0].total_time >= 0.02
+    assert snapshot[1].calls == 1
+
+
+def test_profile_argument_types():
+    @multidispatch(Shape, object)
+    def combine(a, b):
+        return "combined"
+
+    profile = DispatchProfile()
+    combine.profile = profile
+    combine(Circle(), 1)
+    combine(Circle(), 2)
+    combine(Square(), "a")
+
+    assert {(s.argtypes, s.calls) for s in profile.argtypes()} == {
+        ((Circle, int), 2),
+        ((Square, str), 1),
+    }
+    assert all(
+        s.rule is combine.registry.lookup(Shape(), 1) for s in profile.argtypes()
+    )
+
+
+def test_profile_class_arguments():
+    @multidispatch(type[Shape])
+    def create(cls):
+        return cls()
+
+    create.profile = DispatchProfile()
+    create(Circle)
+
+    assert [s.argtypes for s in create.profile.argtypes()] == [(Circle,)]
+
+
+def test_unused_rules(area):
+    with pytest.raises(RuntimeError):
+        area.unused_rules()
+
+    area.profile = DispatchProfile()
+    area(Circle())
+
+    assert {rule.__name__ for rule in area.unused_rules()} == {"area", "square_area"}
+
+
+def test_disable_and_reset(area):
+    profile = DispatchProfile()
+    area.profile = profile
+    area(Square())
+    area.profile = None
+    area(Square())
+
+    assert profile.snapshot()[0].calls == 1
+
+    profile.reset()
+    assert profile.snapshot() == []
+    assert profile.argtypes() == []
+
+
+def test_record_failing_rule():
+    @multidispatch(object)
+    def fail(obj):
+        raise ValueError()
+
+    fail.profile = DispatchProfile()
+    with pytest.raises(ValueError):
+        fail(1)
+
+    assert fail.profile.snapshot()[0].calls == 1
+
+
+def test_as_dict(area):
+    area.profile = DispatchProfile()
+    area(Square())
+
+    data = json.loads(json.dumps(area.profile.as_dict()))
+
+    assert data["rules"][0]["rule"] == f"{__name__}:area.<locals>.square_area"
+    assert data["rules"][0]["calls"] == 1
+    assert data["argtypes"][0]["argtypes"] == [f"{__name__}:Square"]
+
+
+def test_profile_multimethod():
+    @has_multimethods
+    class Canvas:
+        @multimethod(Shape)
+        def draw(self, shape):
+            return "shape"
+
+        @draw.register(Circle)
+        def draw_circle(self, shape):
+            return "circle"
+
+    profile = DispatchProfile()
+    Canvas.draw.profile = profile
+    canvas = Canvas()
+    canvas.draw(Circle())
+
+    assert [s.argtypes for s in profile.argtypes()] == [(Canvas, Circle)]
+    assert [s.rule.__name__ for s in profile.snapshot()] == ["draw_circle"]
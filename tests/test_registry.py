@@ -1,10 +1,20 @@
 """Tests for :module:`generic.registry`."""
 
+import math
 from typing import Union
 
 import pytest
 
-from generic.registry import Registry, SimpleAxis, TypeAxis
+from generic.registry import (
+    AmbiguousLookupError,
+    ChainRegistry,
+    RangeAxis,
+    Registry,
+    SimpleAxis,
+    SubclassAxis,
+    TopicAxis,
+    TypeAxis,
+)
 
 
 class DummyA:
@@ -146,3 +156,439 @@ def test_bad_lookup():
         registry.lookup(foo=1)
     with pytest.raises(ValueError):
         registry.register(1, "foo", name="foo")
+
+
+def test_unregister():
+    registry: Registry[str] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+    registry.register("one", object)
+    registry.register("two", DummyA, "foo")
+
+    assert registry.unregister(DummyA, "foo") == "two"
+    assert registry.lookup(DummyA(), "foo") is None
+    assert DummyA not in registry._tree
+    assert registry.lookup(DummyA()) == "one"
+
+
+def test_unregister_keeps_nodes_in_use():
+    registry: Registry[str] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+    registry.register("one", DummyA)
+    registry.register("two", DummyA, "foo")
+
+    assert registry.unregister(DummyA) == "one"
+    assert registry.lookup(DummyA()) is None
+    assert registry.lookup(DummyA(), "foo") == "two"
+
+
+def test_unregister_missing_registration():
+    registry: Registry[str] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+    registry.register("one", DummyA, "foo")
+
+    assert registry.unregister(DummyA, "bar") is None
+    assert registry.unregister(DummyB) is None
+    assert registry.lookup(DummyA(), "foo") == "one"
+
+
+def test_range_axis():
+    registry: Registry[str] = Registry(("size", RangeAxis()))
+    registry.register("small", (0, 10))
+    registry.register("medium", (10, 100))
+    registry.register("any", (-math.inf, math.inf))
+
+    assert registry.lookup(0) == "small"
+    assert registry.lookup(9.5) == "small"
+    assert registry.lookup(10) == "medium"
+    assert registry.lookup(100) == "any"
+    assert registry.lookup(-1) == "any"
+
+
+def test_range_axis_narrowest_range_first():
+    registry: Registry[str] = Registry(("version", RangeAxis()))
+    registry.register("1.x", (1, 2))
+    registry.register("1.0-1.5", (1, 1.5))
+    registry.register("0.x-1.x", (0, 2))
+
+    assert list(registry.query(1.2)) == ["1.0-1.5", "1.x", "0.x-1.x"]
+    assert list(registry.query(1.7)) == ["1.x", "0.x-1.x"]
+    assert list(registry.query(2)) == []
+
+
+def test_range_axis_index_is_updated():
+    registry: Registry[str] = Registry(("size", RangeAxis()), ("name", SimpleAxis()))
+    registry.register("small", (0, 10))
+    assert registry.lookup(5) == "small"
+
+    registry.register("tiny", (0, 1), "foo")
+    assert registry.lookup(0, "foo") == "tiny"
+
+    registry.unregister((0, 1), "foo")
+    assert registry.lookup(0, "foo") is None
+    assert registry.lookup(0) == "small"
+
+
+def test_range_axis_nested_ranges_added_between_lookups():
+    registry: Registry[str] = Registry(("size", RangeAxis()))
+    ranges = [(-i, i) for i in range(1, 200)] + [(i, i + 3) for i in range(0, 50, 7)]
+    for i, r in enumerate(ranges):
+        registry.register(str(r), r)
+        assert registry.lookup(0) == "(-1, 1)"
+        for obj in (-5, 0.5, 3, 42, 150):
+            expected = [r for r in ranges[: i + 1] if r[0] <= obj < r[1]]
+            expected.sort(key=lambda r: (r[1] - r[0], r[0]))
+            assert list(registry.query(obj)) == [str(r) for r in expected]
+
+
+@pytest.mark.parametrize("key", [(10, 10), (10, 0), (0, 1, 2), (0, "a"), 5, "0-10"])
+def test_range_axis_invalid_range(key):
+    registry: Registry[str] = Registry(("size", RangeAxis()))
+
+    with pytest.raises(ValueError):
+        registry.register("invalid", key)
+    assert registry.lookup(5) is None
+
+
+def test_range_axis_matches():
+    axis = RangeAxis()
+    keys = {(0, 10): None, (5, 10): None, None: None}.keys()
+
+    assert list(axis.matches(7, keys)) == [(5, 10), (0, 10)]
+    assert list(axis.matches(10, keys)) == []
+
+
+def test_topic_axis():
+    registry: Registry[str] = Registry(("topic", TopicAxis()))
+    registry.register("any", "*")
+    registry.register("model", "model.*")
+    registry.register("element", "model.element.*")
+    registry.register("changed", "model.element.changed")
+
+    assert list(registry.query("model.element.changed")) == [
+        "changed",
+        "element",
+        "model",
+        "any",
+    ]
+    assert list(registry.query("model.element.deleted")) == [
+        "element",
+        "model",
+        "any",
+    ]
+    assert list(registry.query("model.element")) == ["model", "any"]
+    assert list(registry.query("model")) == ["any"]
+    assert list(registry.query("diagram.changed")) == ["any"]
+
+
+def test_topic_axis_with_second_axis():
+    registry: Registry[str] = Registry(("type", TypeAxis()), ("topic", TopicAxis()))
+    registry.register("a", DummyA, "model.*")
+    registry.register("b", DummyB, "model.element")
+
+    assert list(registry.query(DummyB(), "model.element")) == ["b", "a"]
+    assert list(registry.query(DummyA(), "model.element")) == ["a"]
+    assert list(registry.query(DummyB(), "diagram")) == []
+
+    registry.unregister(DummyB, "model.element")
+    assert list(registry.query(DummyB(), "model.element")) == ["a"]
+
+
+def test_topic_axis_matches():
+    axis = TopicAxis()
+    keys = {"a.*": None, "a.b": None, None: None, 1: None}.keys()
+
+    assert list(axis.matches("a.b", keys)) == ["a.b", "a.*"]
+    assert list(axis.matches(1, keys)) == []
+
+
+def test_subclass_axis():
+    registry: Registry[str] = Registry(("cls", SubclassAxis()))
+    registry.register("a", DummyA)
+    registry.register("object", object)
+
+    assert list(registry.query(DummyB)) == ["a", "object"]
+    assert list(registry.query(DummyA)) == ["a", "object"]
+    assert list(registry.query(DummyA())) == []
+    assert registry.lookup(type) == "object"
+
+    registry.register("b", DummyB)
+    assert list(registry.query(DummyB)) == ["b", "a", "object"]
+
+
+def test_overlay():
+    registry: Registry[str] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+    registry.register("object", object)
+    registry.register("a", DummyA)
+    overlay = registry.overlay()
+    overlay.register("b", DummyB)
+    overlay.register("a override", DummyA)
+
+    assert list(overlay.query(DummyB())) == ["b", "a override", "object"]
+    assert overlay.get_registration(DummyB) == "b"
+    assert overlay.get_registration(object) is None
+    assert list(registry.query(DummyB())) == ["a", "object"]
+
+
+def test_overlay_sees_changes_in_layers():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    overlay = registry.overlay()
+    assert overlay.lookup(DummyA()) is None
+
+    registry.register("a", DummyA)
+    assert overlay.lookup(DummyA()) == "a"
+
+    overlay.register("a override", DummyA)
+    assert overlay.lookup(DummyA()) == "a override"
+
+    assert overlay.unregister(DummyA) == "a override"
+    assert overlay.lookup(DummyA()) == "a"
+
+
+def test_overlay_of_overlay():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("a", DummyA)
+    overlay = registry.overlay()
+    overlay.register("b", DummyB)
+    overlay2 = overlay.overlay()
+    overlay2.register("object", object)
+
+    assert list(overlay2.query(DummyB())) == ["b", "a", "object"]
+    assert len(overlay2.layers) == 3
+
+
+def test_overlay_orders_matches_of_all_layers():
+    registry: Registry[str] = Registry(("size", RangeAxis()), ("name", SimpleAxis()))
+    registry.register("small", (0, 10))
+    registry.register("any", (0, 1000))
+    registry.register("any foo", (0, 1000), "foo")
+    overlay = registry.overlay()
+    overlay.register("medium", (0, 100))
+    overlay.register("small override", (0, 10))
+    overlay.register("medium foo", (0, 100), "foo")
+
+    assert list(overlay.query(5)) == ["small override", "medium", "any"]
+    assert list(overlay.query(5, "foo")) == ["medium foo", "any foo"]
+    assert list(registry.query(5)) == ["small", "any"]
+
+
+def test_activate_overlay():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("a", DummyA)
+    overlay = registry.overlay()
+    overlay.register("a override", DummyA)
+
+    with overlay.activate():
+        assert registry.lookup(DummyA()) == "a override"
+    assert registry.lookup(DummyA()) == "a"
+
+
+def test_chain_registry_layers_should_have_same_axes():
+    with pytest.raises(ValueError):
+        ChainRegistry(Registry(("type", TypeAxis())), Registry(("name", SimpleAxis())))
+    with pytest.raises(ValueError):
+        ChainRegistry()
+
+
+def test_symmetric_lookup():
+    registry: Registry[str] = Registry(
+        ("a", TypeAxis()), ("b", TypeAxis()), symmetric=True
+    )
+    registry.register("object object", object, object)
+    registry.register("A object", DummyA, object)
+    registry.register("object B", object, DummyB)
+
+    assert registry.lookup(DummyA(), DummyA()) == "A object"
+    assert registry.lookup(object(), DummyB()) == "object B"
+    with pytest.raises(AmbiguousLookupError):
+        registry.lookup(DummyA(), DummyB())
+    with pytest.raises(AmbiguousLookupError):
+        list(registry.query(DummyB(), DummyB()))
+
+    registry.register("A B", DummyA, DummyB)
+    assert list(registry.query(DummyB(), DummyB())) == [
+        "A B",
+        "A object",
+        "object B",
+        "object object",
+    ]
+
+
+def test_symmetric_lookup_cache_is_updated():
+    registry: Registry[str] = Registry(
+        ("a", TypeAxis()), ("b", TypeAxis()), symmetric=True
+    )
+    registry.register("A A", DummyA, DummyA)
+    assert registry.lookup(DummyB(), DummyB()) == "A A"
+
+    registry.register("B A", DummyB, DummyA)
+    assert registry.lookup(DummyB(), DummyB()) == "B A"
+    registry.register("A B", DummyA, DummyB)
+    with pytest.raises(AmbiguousLookupError):
+        registry.lookup(DummyB(), DummyB())
+
+    registry.unregister(DummyA, DummyB)
+    assert registry.lookup(DummyB(), DummyB()) == "B A"
+
+
+def test_symmetric_lookup_cache_is_keyed_on_matching_keys():
+    registry: Registry[str] = Registry(
+        ("size", RangeAxis()), ("name", SimpleAxis()), symmetric=True
+    )
+    registry.register("small", (0, 10), "foo")
+    registry.register("any", (0, 1000), "foo")
+    overlay = registry.overlay()
+    overlay.register("medium", (0, 100), "foo")
+
+    for i in range(1000):
+        assert registry.lookup(i, "foo") == ("small" if i < 10 else "any")
+        registry.lookup(i, f"bar{i}")
+        assert overlay.lookup(i, "foo") == (
+            "small" if i < 10 else "medium" if i < 100 else "any"
+        )
+
+    assert len(registry._resolved) == 4
+    assert len(overlay._resolved) == 3
+
+    registry.unregister((0, 10), "foo")
+    assert registry.lookup(5, "foo") == "any"
+    assert overlay.lookup(5, "foo") == "medium"
+
+
+def test_symmetric_overlay():
+    registry: Registry[str] = Registry(
+        ("a", TypeAxis()), ("b", TypeAxis()), symmetric=True
+    )
+    registry.register("A object", DummyA, object)
+    overlay = registry.overlay()
+    assert overlay.lookup(DummyA(), DummyA()) == "A object"
+
+    overlay.register("object A", object, DummyA)
+    with pytest.raises(AmbiguousLookupError):
+        overlay.lookup(DummyA(), DummyA())
+    assert registry.lookup(DummyA(), DummyA()) == "A object"
+
+
+def test_symmetric_lookup_with_fewer_objects_than_axes():
+    registry: Registry[str] = Registry(
+        ("a", TypeAxis()), ("b", TypeAxis()), symmetric=True
+    )
+    registry.register("A", DummyA)
+
+    assert registry.lookup(DummyB()) == "A"
+
+
+def test_multi_registration():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A 1", DummyA, multi=True)
+    registry.register("B 1", DummyB, multi=True)
+    registry.register("A 2", DummyA, multi=True)
+    registry.register("B 2", DummyB, multi=True)
+
+    assert list(registry.query(DummyB())) == ["B 1", "B 2", "A 1", "A 2"]
+    assert registry.lookup(DummyA()) == "A 1"
+    assert registry.get_registrations(DummyA) == ("A 1", "A 2")
+    assert registry.get_registration(DummyA) == "A 1"
+
+
+def test_discard_multi_registration():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A 1", DummyA, multi=True)
+    registry.register("A 2", DummyA, multi=True)
+
+    assert registry.discard("A 1", DummyA)
+    assert not registry.discard("A 1", DummyA)
+    assert list(registry.query(DummyB())) == ["A 2"]
+
+    assert registry.discard("A 2", DummyA)
+    assert registry.get_registrations(DummyA) == ()
+    assert list(registry._tree) == []
+
+
+def test_multi_registration_of_same_target():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A 1", DummyA, multi=True)
+    registry.register("A 2", DummyA, multi=True)
+    registry.register("A 1", DummyA, multi=True)
+
+    assert registry.get_registrations(DummyA) == ("A 1", "A 2")
+
+
+def test_query_during_multi_discard():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A 1", DummyA, multi=True)
+    registry.register("A 2", DummyA, multi=True)
+
+    queried = []
+    for target in registry.query(DummyA()):
+        queried.append(target)
+        registry.discard("A 2", DummyA)
+
+    assert queried == ["A 1", "A 2"]
+    assert list(registry.query(DummyA())) == ["A 1"]
+
+
+def test_unregister_multi_registration():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A 1", DummyA, multi=True)
+    registry.register("A 2", DummyA, multi=True)
+
+    assert registry.unregister(DummyA) == "A 1"
+    assert registry.lookup(DummyA()) is None
+
+
+def test_discard_single_registration():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A", DummyA)
+
+    assert not registry.discard("B", DummyA)
+    assert registry.discard("A", DummyA)
+    assert registry.lookup(DummyA()) is None
+
+
+def test_mix_single_and_multi_registration():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A", DummyA)
+    registry.register("B", DummyB, multi=True)
+
+    with pytest.raises(ValueError):
+        registry.register("A 2", DummyA, multi=True)
+    with pytest.raises(ValueError):
+        registry.register("B 2", DummyB)
+    assert list(registry.query(DummyB())) == ["B", "A"]
+
+
+def test_query_during_multi_registration():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A 1", DummyA, multi=True)
+
+    queried = []
+    for target in registry.query(DummyA()):
+        queried.append(target)
+        registry.register("A 2", DummyA, multi=True)
+
+    assert queried == ["A 1"]
+    assert registry.get_registrations(DummyA) == ("A 1", "A 2")
+
+
+def test_multi_registration_in_overlay():
+    registry: Registry[str] = Registry(("type", TypeAxis()))
+    registry.register("A", DummyA, multi=True)
+    overlay = registry.overlay()
+    assert list(overlay.query(DummyA())) == ["A"]
+
+    overlay.register("A overlay", DummyA, multi=True)
+    assert list(overlay.query(DummyB())) == ["A overlay", "A"]
+    assert overlay.discard("A overlay", DummyA)
+    assert list(overlay.query(DummyB())) == ["A"]
+    assert registry.get_registrations(DummyA) == ("A",)
+
+
+def test_symmetric_multi_registration():
+    registry: Registry[str] = Registry(
+        ("a", TypeAxis()), ("b", TypeAxis()), symmetric=True
+    )
+    registry.register("A A 1", DummyA, DummyA, multi=True)
+    registry.register("A A 2", DummyA, DummyA, multi=True)
+    registry.register("B A", DummyB, DummyA, multi=True)
+
+    assert list(registry.query(DummyB(), DummyA())) == ["B A", "A A 1", "A A 2"]
+
+    registry.discard("B A", DummyB, DummyA)
+    assert list(registry.query(DummyB(), DummyA())) == ["A A 1", "A A 2"]
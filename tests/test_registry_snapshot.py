@@ -0,0 +1,169 @@
+"""Tests for registry snapshots, :meth:`generic.registry.Registry.dump` and
+:meth:`generic.registry.Registry.load`."""
+
+from __future__ import annotations
+
+import io
+import sys
+import textwrap
+import types
+from typing import Any
+
+import pytest
+
+from generic.registry import Registry, SimpleAxis, TypeAxis
+
+TYPES = """
+from generic.registry import Registry, SimpleAxis, TypeAxis
+
+class Model:
+    pass
+
+class Element(Model):
+    pass
+
+registry = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+"""
+
+RULES = """
+from snapshot_types import Element, Model, registry
+
+def model_rule(obj):
+    return "model"
+
+def element_rule(obj):
+    return "element"
+
+registry.register(model_rule, Model)
+registry.register(element_rule, Element, "name")
+"""
+
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    (tmp_path / "snapshot_types.py").write_text(textwrap.dedent(TYPES))
+    (tmp_path / "snapshot_rules.py").write_text(textwrap.dedent(RULES))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in ("snapshot_types", "snapshot_rules"):
+        sys.modules.pop(name, None)
+
+
+def snapshot(modules):
+    import snapshot_rules  # noqa: F401
+    import snapshot_types
+
+    file = io.StringIO()
+    snapshot_types.registry.dump(file)
+    del sys.modules["snapshot_rules"], sys.modules["snapshot_types"]
+    file.seek(0)
+    return file
+
+
+def test_load_imports_targets_lazily(modules):
+    file = snapshot(modules)
+    registry: Registry[Any] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+
+    assert registry.load(file)
+    assert "snapshot_rules" not in sys.modules
+    assert "snapshot_types" not in sys.modules
+
+    from snapshot_types import Element
+
+    rule = registry.lookup(Element(), "name")
+    assert rule
+    assert rule(None) == "element"
+    assert "snapshot_rules" in sys.modules
+    assert (
+        registry.get_registration(Element, "name")
+        is sys.modules["snapshot_rules"].element_rule
+    )
+
+
+def test_module_registering_again_replaces_lazy_targets(modules):
+    file = snapshot(modules)
+    import snapshot_types
+
+    assert snapshot_types.registry.load(file)
+    import snapshot_rules
+
+    assert snapshot_types.registry.lookup(snapshot_types.Model()) is (
+        snapshot_rules.model_rule
+    )
+
+
+def test_changed_source_invalidates_snapshot(modules):
+    file = snapshot(modules)
+    (modules / "snapshot_rules.py").write_text(textwrap.dedent(RULES) + "\n# changed\n")
+    registry: Registry[Any] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+
+    assert not registry.load(file)
+    assert list(registry._tree) == []
+
+
+def test_load_keeps_existing_registrations(modules):
+    file = snapshot(modules)
+    from snapshot_types import Model
+
+    registry: Registry[Any] = Registry(("type", TypeAxis()), ("name", SimpleAxis()))
+    registry.register("existing", Model)
+
+    assert registry.load(file)
+    assert registry.get_registration(Model) == "existing"
+
+
+def test_dump_target_in_main_module(tmp_path, monkeypatch):
+    script = tmp_path / "script.py"
+    script.write_text("def rule(obj):\n    pass\n")
+    main = types.ModuleType("__main__")
+    main.__file__ = str(script)
+    main.__spec__ = None
+    monkeypatch.setitem(sys.modules, "__main__", main)
+
+    def rule(obj):
+        pass
+
+    rule.__module__ = "__main__"
+    rule.__qualname__ = "rule"
+    main.rule = rule  # type: ignore[attr-defined]
+    registry: Registry[Any] = Registry(("name", SimpleAxis()))
+    registry.register(rule, "name")
+    file = io.StringIO()
+    registry.dump(file)
+
+    file.seek(0)
+    restored: Registry[Any] = Registry(("name", SimpleAxis()))
+    assert restored.load(file)
+    lazy_rule = restored.lookup("name")
+    assert lazy_rule is not None
+    assert lazy_rule.resolve() is rule
+    script.write_text("# changed\n")
+    file.seek(0)
+    assert not Registry(("name", SimpleAxis())).load(file)
+
+
+def test_dump_target_without_qualified_name():
+    registry: Registry[object] = Registry(("name", SimpleAxis()))
+    registry.register(lambda: None, "name")
+
+    with pytest.raises(TypeError):
+        registry.dump(io.StringIO())
+
+
+def test_multi_registrations():
+    registry: Registry[Any] = Registry(("type", TypeAxis()))
+    registry.register(textwrap.dedent, object, multi=True)
+    registry.register(textwrap.indent, object, multi=True)
+    file = io.StringIO()
+    registry.dump(file)
+
+    restored: Registry[Any] = Registry(("type", TypeAxis()))
+    file.seek(0)
+    assert restored.load(file)
+    file.seek(0)
+    assert restored.load(file)
+
+    lazy_dedent, lazy_indent = restored.get_registrations(object)
+    assert repr(lazy_indent) == "<lazy textwrap:indent>"
+    assert lazy_dedent(" a") == "a"
+    assert restored.get_registrations(object) == (textwrap.dedent, lazy_indent)